@@ -0,0 +1,45 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from typing import Callable, Dict, Hashable, List, Tuple
+
+# Mirrors the dict_keys strategy used by the tests; None and booleans have too
+# few distinct values to fill a dict by themselves, so only appear in "mixed"
+key_makers: Dict[str, Callable[[int], Hashable]] = {
+	"int": lambda i: i * 2654435761 % 2 ** 61,
+	"float": lambda i: i / 7,
+	"complex": lambda i: complex(i, -i),
+	"str": lambda i: "bench-key-{0}".format(i),
+	"tuple": lambda i: (i,),
+	"frozenset": lambda i: frozenset((i, -i - 1)),
+	}
+
+mixed_makers = list(key_makers.values())
+
+key_makers["mixed"] = lambda i: (None if i == 0
+								 else mixed_makers[i % len(mixed_makers)](i))
+
+key_types = list(key_makers)
+
+# Bytes used by each container after inserting keys, as
+# (key type, size, container name, bytes used, bytes used relative to dict)
+memory_report: List[Tuple[str, int, str, int, float]] = []
+
+
+def make_keys(key_type: str, start: int, stop: int) -> List[Hashable]:
+	"""
+	Make distinct keys of the given type
+
+	:param key_type: One of the names in key_types
+	:param start: The number the first key is made from
+	:param stop: The number after the one the last key is made from
+
+	:returns: The keys made from every number in the given range
+	"""
+	return list(map(key_makers[key_type], range(start, stop)))
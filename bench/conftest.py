@@ -0,0 +1,36 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from bench import memory_report
+
+
+def pytest_addoption(parser):
+	parser.addoption("--bench-max-size",
+					 type=int,
+					 default=10 ** 5,
+					 help="Largest number of entries to benchmark with")
+
+
+def pytest_generate_tests(metafunc):
+	if "size" in metafunc.fixturenames:
+		max_size = metafunc.config.getoption("bench_max_size")
+		sizes = [10 ** exp for exp in range(2, 8) if 10 ** exp <= max_size]
+		metafunc.parametrize("size", sizes, ids=lambda size: "{0:.0e}".format(size))
+
+
+def pytest_terminal_summary(terminalreporter):
+	if memory_report:
+		terminalreporter.section("memory used after inserting")
+		terminalreporter.write_line("{0:<10} {1:>8} {2:<14} {3:>14} {4:>8}".format(
+			"Keys", "Size", "Container", "Bytes", "vs dict"))
+
+		for (key_type, size, name, used, relative) in sorted(memory_report):
+			terminalreporter.write_line(
+				"{0:<10} {1:>8.0e} {2:<14} {3:>14,} {4:>8.2f}".format(
+					key_type, size, name, used, relative))
@@ -0,0 +1,199 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from operator import and_, or_, sub, xor
+from tracemalloc import get_traced_memory, start, stop
+
+import pytest
+
+from bench import key_types, make_keys, memory_report
+from py_hopscotch_dict import FrozenHopscotchDict, HopscotchDict, HopscotchSet
+
+impls = pytest.mark.parametrize("impl", [dict, HopscotchDict],
+	ids = ["dict", "HopscotchDict"])
+
+# Read-only benchmarks also cover dicts that can't be built by insertion
+read_impls = pytest.mark.parametrize("impl",
+	[dict, HopscotchDict, FrozenHopscotchDict],
+	ids = ["dict", "HopscotchDict", "FrozenHopscotchDict"])
+
+keys_of_type = pytest.mark.parametrize("key_type", key_types)
+
+
+def _rounds(size):
+	# Keep the total work per benchmark roughly constant across sizes
+	return max(1, min(20, 10 ** 6 // size))
+
+
+def _filled(impl, keys):
+	if impl is FrozenHopscotchDict:
+		return impl(_filled(HopscotchDict, keys))
+
+	out = impl()
+
+	for key in keys:
+		out[key] = key
+
+	return out
+
+
+def _memory_used(impl, keys):
+	start()
+	try:
+		container = _filled(impl, keys)
+		used, _ = get_traced_memory()
+	finally:
+		stop()
+
+	del container
+	return used
+
+
+def _run(benchmark, op, impl, key_type, size, func, setup):
+	benchmark.group = "{0}-{1}-{2:.0e}".format(op, key_type, size)
+	benchmark.pedantic(func, setup=setup, rounds=_rounds(size), iterations=1)
+
+	# The benchmarked functions each perform one operation per key; nothing
+	# is timed when benchmarks are disabled
+	if benchmark.stats is not None:
+		benchmark.extra_info["item_ops_per_sec"] = (
+			size / benchmark.stats.stats.mean)
+
+
+@impls
+@keys_of_type
+def test_insert(benchmark, impl, key_type, size):
+	keys = make_keys(key_type, 0, size)
+
+	def setup():
+		return (impl(),), {}
+
+	def insert(container):
+		for key in keys:
+			container[key] = key
+
+	_run(benchmark, "insert", impl, key_type, size, insert, setup)
+
+	memory = _memory_used(impl, keys)
+	relative_memory = memory / _memory_used(dict, keys)
+
+	benchmark.extra_info["memory_bytes"] = memory
+	benchmark.extra_info["memory_vs_dict"] = relative_memory
+	memory_report.append(
+		(key_type, size, impl.__name__, memory, relative_memory))
+
+
+@read_impls
+@keys_of_type
+def test_hit_lookup(benchmark, impl, key_type, size):
+	keys = make_keys(key_type, 0, size)
+	container = _filled(impl, keys)
+
+	def lookup():
+		for key in keys:
+			container[key]
+
+	_run(benchmark, "hit", impl, key_type, size, lookup, None)
+
+
+@read_impls
+@keys_of_type
+def test_miss_lookup(benchmark, impl, key_type, size):
+	container = _filled(impl, make_keys(key_type, 0, size))
+	misses = make_keys(key_type, size, 2 * size)
+
+	def lookup():
+		for key in misses:
+			key in container
+
+	_run(benchmark, "miss", impl, key_type, size, lookup, None)
+
+
+@pytest.mark.parametrize("method", ["dict-get", "get", "get_many"])
+@keys_of_type
+def test_batch_lookup(benchmark, method, key_type, size):
+	keys = make_keys(key_type, 0, size)
+	impl = dict if method == "dict-get" else HopscotchDict
+	container = _filled(impl, keys)
+
+	# Half the keys are misses, as in a typical batch of requests
+	batch = keys[::2] + make_keys(key_type, size, size + size // 2)
+
+	if method == "get_many":
+		def lookup():
+			container.get_many(batch)
+	else:
+		def lookup():
+			[container.get(key) for key in batch]
+
+	_run(benchmark, "batch", impl, key_type, size, lookup, None)
+
+
+@pytest.mark.parametrize("impl", [set, HopscotchSet],
+	ids = ["set", "HopscotchSet"])
+@pytest.mark.parametrize("op", ["&", "|", "-", "^"],
+	ids = ["and", "or", "sub", "xor"])
+@keys_of_type
+def test_set_ops(benchmark, impl, op, key_type, size):
+	# The operands share half their keys
+	left = impl(make_keys(key_type, 0, size))
+	right = impl(make_keys(key_type, size // 2, size + size // 2))
+	apply_op = {"&": and_, "|": or_, "-": sub, "^": xor}[op]
+
+	def set_op():
+		apply_op(left, right)
+
+	_run(benchmark, "set{0}".format(op), impl, key_type, size, set_op, None)
+
+
+@impls
+@keys_of_type
+def test_delete(benchmark, impl, key_type, size):
+	keys = make_keys(key_type, 0, size)
+
+	def setup():
+		return (_filled(impl, keys),), {}
+
+	def delete(container):
+		for key in keys:
+			del container[key]
+
+	_run(benchmark, "delete", impl, key_type, size, delete, setup)
+
+
+@impls
+@keys_of_type
+def test_iterate(benchmark, impl, key_type, size):
+	container = _filled(impl, make_keys(key_type, 0, size))
+
+	def iterate():
+		for _ in container.items():
+			pass
+
+	_run(benchmark, "iterate", impl, key_type, size, iterate, None)
+
+
+@impls
+@keys_of_type
+def test_copy(benchmark, impl, key_type, size):
+	container = _filled(impl, make_keys(key_type, 0, size))
+
+	_run(benchmark, "copy", impl, key_type, size, container.copy, None)
+
+
+@impls
+@keys_of_type
+def test_eq(benchmark, impl, key_type, size):
+	container = _filled(impl, make_keys(key_type, 0, size))
+	other = _filled(impl, make_keys(key_type, 0, size))
+
+	def eq():
+		assert container == other
+
+	_run(benchmark, "eq", impl, key_type, size, eq, None)
@@ -9,8 +9,24 @@
 
 from io import open
 from os.path import abspath, dirname, join
+from sys import version_info
 
+from py_hopscotch_dict.bidict import HopscotchBiDict as HopscotchBiDict
+from py_hopscotch_dict.frozendict import FrozenHopscotchDict as FrozenHopscotchDict
 from py_hopscotch_dict.hopscotchdict import HopscotchDict as HopscotchDict
+from py_hopscotch_dict.hopscotchset import HopscotchSet as HopscotchSet
+from py_hopscotch_dict.mappeddict import MappedHopscotchDict as MappedHopscotchDict
+
+# NumPy is an optional dependency
+try:
+	from py_hopscotch_dict.numpydict import IntHopscotchDict as IntHopscotchDict
+except ImportError:											  # pragma: no cover
+	pass
+
+# Shared memory was added in Python 3.8
+if version_info >= (3, 8):
+	from py_hopscotch_dict.shareddict import (
+		SharedHopscotchDict as SharedHopscotchDict)
 
 module_root = dirname(abspath(__file__))
 
@@ -0,0 +1,265 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+"""
+A HopscotchDict whose values are unique and can be looked up in constant time
+
+Keys and values are stored once, in the dict's own _keys/_values lists; a
+second lookup table, laid out by the hashes of the values, indexes the same
+lists the other way around.
+"""
+
+from array import array
+from types import MappingProxyType
+from typing import Any, cast, Dict, Hashable, List, Mapping, Tuple
+
+from py_hopscotch_dict.hopscotchdict import HopscotchDict
+
+
+class HopscotchBiDict(HopscotchDict):
+	__slots__ = ("_inverse",)
+
+	@property
+	def inverse(self) -> Mapping[Any, Hashable]:
+		"""
+		A read-only mapping from each value to the key it is stored under,
+		which changes along with the dict
+
+		:returns: A view of the dict from values to keys
+		"""
+		return MappingProxyType(self._inverse)
+
+	def clear(self) -> None:
+		"""
+		Remove all the data from the dict and return it to its original size
+		"""
+		super(HopscotchBiDict, self).clear()
+		self._build_inverse()
+
+	def compact(self) -> None:
+		"""
+		Shrink both lookup tables to the smallest size that can hold the
+		current entries
+		"""
+		super(HopscotchBiDict, self).compact()
+		self._inverse.compact()
+
+	def keys_for_value(self, value: Any) -> List[Hashable]:
+		"""
+		Find the key mapped to the given value
+
+		:param value: The value to search for
+
+		:returns: A list holding the key stored under the value if there is
+				  one, or an empty list if there isn't
+		"""
+		_, data_idx = self._inverse._lookup(value)
+		return [] if data_idx is None else [self._keys[data_idx]]
+
+	def reserve(self, count: int) -> None:
+		"""
+		Grow both lookup tables so they can hold the given number of entries
+		without needing to resize again
+
+		:param count: The number of entries the dict should be able to hold
+		"""
+		super(HopscotchBiDict, self).reserve(count)
+		self._inverse.reserve(count)
+
+	def update(self, *args: Any, **kwargs: Any) -> None:
+		"""
+		Insert all the given items, checking each value against those
+		already stored
+
+		:param args: A mapping or iterable of `(key, value)` pairs
+		:param kwargs: Additional items to insert
+		"""
+		if len(args) > 1:
+			raise TypeError("update expected at most 1 argument, got {0}"
+							.format(len(args)))
+
+		pending = dict(*args, **kwargs)
+		self.reserve(self._count + len(pending))
+
+		for key, value in pending.items():
+			self.__setitem__(key, value)
+
+	def _build_inverse(self) -> None:
+		"""
+		Lay out the lookup table of values from scratch
+		"""
+		inverse = HopscotchDict(max_density=self._max_density,
+								growth_factor=self._growth_factor,
+								large_table_size=self._large_table_size)
+
+		# The inverse table indexes the same lists, with their roles swapped
+		inverse._keys = self._values
+		inverse._values = self._keys
+		inverse._hashes = array("q", map(hash, self._values))
+		inverse._count = self._count
+
+		inverse._rebuild(inverse._min_size_for(inverse._count))
+		self._inverse = inverse
+
+	def _clone(self, keys: List[Hashable], values: List[Any]) -> "HopscotchBiDict":
+		"""
+		Create a new instance of the same type and configuration as this one,
+		using the given keys and values with this instance's lookup tables
+
+		:param keys: The keys for the new instance, in the same order as _keys
+		:param values: The values for the new instance, in the same order as
+					   _values
+
+		:returns: A new instance sharing nothing mutable with this one
+		"""
+		out = cast(HopscotchBiDict,
+				   super(HopscotchBiDict, self)._clone(keys, values))
+		out._inverse = self._inverse._clone(values, keys)
+		return out
+
+	def _has_value(self, value: Any) -> bool:
+		"""
+		Check whether any key maps to the given value
+
+		:param value: The value to search for
+
+		:return: True if the value is stored, False otherwise
+		"""
+		_, data_idx = self._inverse._lookup(value)
+		return data_idx is not None
+
+	def _place_inverse(self, data_idx: int, value_hash: int) -> None:
+		"""
+		Store the given index into _keys/_values in the lookup table of values,
+		resizing it if necessary
+
+		:param data_idx: The index into _keys/_values to store
+		:param value_hash: The hash of the value at that index
+		"""
+		inverse = self._inverse
+		inverse._hashes[data_idx] = value_hash
+
+		if not inverse._place(data_idx, value_hash):
+			inverse._rebuild(inverse._next_size())
+
+	def _remove(self, lookup_idx: int, data_idx: int) -> None:
+		"""
+		Remove the entry found by `_lookup_for_removal` at the given indices
+
+		:param lookup_idx: The index in _lookup_table pointing to the entry
+		:param data_idx: The index of the entry in _keys/_values
+		"""
+		# The tail entry is moved into the removed entry's place, in both
+		# lookup tables
+		inverse = self._inverse
+		tail_data_idx = self._count - 1
+		inverse._repoint(data_idx, inverse.FREE_ENTRY)
+
+		if data_idx != tail_data_idx:
+			inverse._repoint(tail_data_idx, data_idx)
+			inverse._hashes[data_idx] = inverse._hashes[tail_data_idx]
+
+		del inverse._hashes[-1]
+		inverse._count -= 1
+
+		super(HopscotchBiDict, self)._remove(lookup_idx, data_idx)
+
+	def __setitem__(self, key: Hashable, value: Any) -> None:
+		"""
+		Map the given key to the given value, overwriting any previously-stored
+		value if it exists; errors if another key already maps to the value
+
+		:param key: The key to set
+		:param value: The value to map the key to
+		"""
+		inverse = self._inverse
+		value_hash = hash(value)
+		_, owner_idx = inverse._lookup(value, value_hash)
+		_, data_idx = self._lookup(key)
+
+		if owner_idx is not None and owner_idx != data_idx:
+			raise ValueError("Value {0!r} is already mapped to by key {1!r}"
+							 .format(value, self._keys[owner_idx]))
+
+		# Overwrite an existing key, moving its entry in the lookup table of
+		# values if the value changed
+		if data_idx is not None:
+			if owner_idx is None:
+				old_hash = inverse._hashes[data_idx]
+				inverse._repoint(data_idx, inverse.FREE_ENTRY)
+
+				try:
+					self._place_inverse(data_idx, value_hash)
+				except BaseException:
+					# The slot just freed is still in the old neighborhood
+					self._place_inverse(data_idx, old_hash)
+					raise
+
+			super(HopscotchBiDict, self).__setitem__(key, value)
+			return
+
+		# Both tables index the entry appended to the shared lists
+		super(HopscotchBiDict, self).__setitem__(key, value)
+		inverse._hashes.append(value_hash)
+		inverse._count += 1
+
+		try:
+			self._place_inverse(self._count - 1, value_hash)
+		except BaseException:
+			del inverse._hashes[-1]
+			inverse._count -= 1
+			lookup_idx, data_idx = self._lookup_for_removal(key)
+			super(HopscotchBiDict, self)._remove(cast(int, lookup_idx),
+												 cast(int, data_idx))
+			raise
+
+		if inverse._count / inverse._size >= inverse._max_density:
+			inverse._grow()
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> "HopscotchBiDict":
+		out = cast(HopscotchBiDict,
+				   super(HopscotchBiDict, self).__deepcopy__(memo))
+
+		# The copied values may hash differently, and aren't the lists the
+		# cloned lookup table of values indexes
+		out._build_inverse()
+		return out
+
+	def __reduce_ex__(self, protocol: Any) -> Tuple[Any, ...]:
+		"""
+		Describe how to pickle the dict, leaving out the lookup table of values
+		since it is rebuilt when unpickled
+
+		:param protocol: The pickle protocol in use
+
+		:returns: A tuple creating an empty instance of the same type and the
+				  state to restore into it
+		"""
+		reduced = super(HopscotchBiDict, self).__reduce_ex__(protocol)
+		reduced[2].pop("_inverse", None)
+		return reduced
+
+	def __repr__(self) -> str:
+		"""
+		Return a representation that could be used to create an equivalent dict
+		using `eval()`
+
+		:returns: A string that could be used to create an equivalent
+				  representation
+		"""
+		return "HopscotchBiDict({0})".format(self.__str__())
+
+	def __setstate__(self, state: Dict[str, Any]) -> None:
+		"""
+		Restore a pickled dict, rebuilding its lookup table of values
+
+		:param state: The state created by __reduce_ex__
+		"""
+		super(HopscotchBiDict, self).__setstate__(state)
+		self._build_inverse()
@@ -0,0 +1,239 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from array import array
+from typing import (Any,
+					Hashable,
+					Iterator,
+					Mapping,
+					Optional,
+					Tuple
+					)
+
+from py_hopscotch_dict.hopscotchdict import HopscotchDict
+
+
+class FrozenHopscotchDict(Mapping[Hashable, Any]):
+	__slots__ = ("_count", "_hash", "_hashes", "_indices", "_keys", "_mask",
+				 "_nbhds", "_size", "_values")
+
+	def copy(self) -> "FrozenHopscotchDict":
+		"""
+		Return the dict itself, since it can't be changed
+
+		:returns: This instance
+		"""
+		return self
+
+	def get(self, key: Hashable, default: Any=None) -> Any:
+		"""
+		Retrieve the value corresponding to the specified key, returning the
+		default value if not found
+
+		:param key: The key to retrieve data from
+		:param default: The value to return if the specified key does not exist
+
+		:returns: The value in the dict if the specified key exists;
+				  the default value if it does not
+		"""
+		data_idx = self._lookup(key)
+		return default if data_idx is None else self._values[data_idx]
+
+	def _lookup(self, key: Hashable) -> Optional[int]:
+		"""
+		Find the index in _keys of the given key
+
+		:param key: The key to search for in the dict
+
+		:return: The index of the key, or None if it is not in the dict
+		"""
+		key_hash = hash(key)
+		mask = self._mask
+		expected_lookup_idx = abs(key_hash) & mask
+		nbhd = self._nbhds[expected_lookup_idx]
+
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			data_idx = self._indices[
+				(expected_lookup_idx + lowest_bit.bit_length() - 1) & mask]
+
+			nbr_key = self._keys[data_idx]
+			if nbr_key is key or (self._hashes[data_idx] == key_hash
+								  and nbr_key == key):
+				return data_idx
+
+		return None
+
+	def __init__(self, *args: Any, **kwargs: Any) -> None:
+		"""
+		Create a new instance holding the given items, in the smallest lookup
+		table that can hold them
+
+		:param args: A mapping or iterable of `(key, value)` pairs
+		:param kwargs: Additional items to include
+		"""
+		self._hashes: array
+		source = args[0] if len(args) == 1 else None
+
+		# Hashes already computed for another hopscotch dict can be reused
+		if (isinstance(source, (HopscotchDict, FrozenHopscotchDict))
+				and not kwargs):
+			self._keys: Tuple[Hashable, ...] = tuple(source._keys)
+			self._values: Tuple[Any, ...] = tuple(source._values)
+			hashes = array("q", source._hashes)
+		else:
+			items = dict(*args, **kwargs)
+			self._keys = tuple(items)
+			self._values = tuple(items.values())
+			hashes = array("q", map(hash, self._keys))
+
+		_, self._indices, self._nbhds = HopscotchDict._build_lookup_table(hashes)
+		self._hashes = hashes
+		self._count = len(self._keys)
+		self._size = len(self._indices)
+
+		# Table sizes are powers of 2, so masking is the same as taking the
+		# remainder, only faster
+		self._mask = self._size - 1
+
+		self._hash: Optional[int] = None
+
+	def __getitem__(self, key: Hashable) -> Any:
+		"""
+		Retrieve the value associated with the given key,
+		erroring if the key does not exist
+
+		:param key: The key to search for
+
+		:returns: The value associated with the given key
+		"""
+		# Inlined from _lookup, since this is the hottest path
+		key_hash = hash(key)
+		mask = self._mask
+		expected_lookup_idx = abs(key_hash) & mask
+		nbhd = self._nbhds[expected_lookup_idx]
+
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			data_idx = self._indices[
+				(expected_lookup_idx + lowest_bit.bit_length() - 1) & mask]
+
+			nbr_key = self._keys[data_idx]
+			if nbr_key is key or (self._hashes[data_idx] == key_hash
+								  and nbr_key == key):
+				return self._values[data_idx]
+
+		raise KeyError(key)
+
+	def __contains__(self, key: Any) -> bool:
+		"""
+		Check if the given key exists
+
+		:returns: True if the key exists, False otherwise
+		"""
+		return self._lookup(key) is not None
+
+	def __copy__(self) -> "FrozenHopscotchDict":
+		return self
+
+	def __eq__(self, other: Any) -> bool:
+		"""
+		Check if the given object is a mapping with the same items as this dict
+
+		:param other: The object to test for equality to this dict
+
+		:returns: True if the given object is equivalent to this dict,
+				  False otherwise
+		"""
+		if not isinstance(other, Mapping):
+			return NotImplemented
+
+		if self._count != len(other):
+			return False
+
+		# Dicts with different items almost always hash differently
+		if (isinstance(other, FrozenHopscotchDict)
+				and self._hash is not None
+				and other._hash is not None
+				and self._hash != other._hash):
+			return False
+
+		# Values are compared the same way HopscotchDict compares them, so
+		# equality between the two is symmetric
+		missing = object()
+		for key, value in zip(self._keys, self._values):
+			other_value = other.get(key, missing)
+			if other_value is missing:
+				return False
+
+			if not (value == other_value and type(value) == type(other_value)):
+				return False
+
+		return True
+
+	def __hash__(self) -> int:
+		"""
+		Hash the items of the dict, which must all be hashable; the hash is
+		only computed once
+
+		:returns: The same hash as a frozenset of the items
+		"""
+		if self._hash is None:
+			self._hash = hash(frozenset(zip(self._keys, self._values)))
+
+		return self._hash
+
+	def __iter__(self) -> Iterator[Hashable]:
+		"""
+		Return an iterator over the keys
+
+		:returns: An iterator over the keys
+		"""
+		return iter(self._keys)
+
+	def __len__(self) -> int:
+		"""
+		Return the number of items stored
+
+		:returns: The number of items stored
+		"""
+		return self._count
+
+	def __reduce__(self) -> Tuple[Any, ...]:
+		return (self.__class__, (dict(zip(self._keys, self._values)),))
+
+	def __repr__(self) -> str:
+		"""
+		Return a representation that could be used to create an equivalent dict
+		using `eval()`
+
+		:returns: A string that could be used to create an equivalent
+				  representation
+		"""
+		return "{0}({1})".format(self.__class__.__name__, self.__str__())
+
+	def __reversed__(self) -> Iterator[Hashable]:
+		"""
+		Return an iterator over the keys in reverse order
+
+		:returns: An iterator over the keys in reverse order
+		"""
+		return reversed(self._keys)
+
+	def __str__(self) -> str:
+		"""
+		Return a simpler representation of the items in the dict
+
+		:returns: A string containing all items in the dict
+		"""
+		return "{{{0}}}".format(", ".join(
+			"{0!r}: {1!r}".format(key, val)
+			for key, val in zip(self._keys, self._values)))
@@ -0,0 +1,86 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+"""
+Opt-in instrumentation for the expensive parts of HopscotchDict
+
+Hooks are called like `sys.audit` hooks, with the name of the event and a
+tuple of its arguments, and are shared by every instance. The events are:
+
+- resize_start (old size, new size, entry count): a dict is about to move its
+  entries to a lookup table of a different size
+- resize_end (old size, new size, entry count, duration in seconds): a dict
+  finished moving its entries to its new lookup table
+- resize_abort (old size, new size, entry count, duration in seconds): a dict
+  could not fit its entries in the new lookup table and kept its old one; it
+  may try again at a larger size
+- free_up (index, number of entries moved): an index's neighborhood was opened
+  up by moving entries further down the lookup table
+- nbhd_exhausted (index, dict size, neighborhood size): an index's
+  neighborhood could not be opened up, forcing the dict to grow
+
+Every resize_start is followed by either resize_end or resize_abort. When a
+dict grows incrementally, resize_end is fired once the new lookup table is in
+place; its entries move over during later operations.
+
+Hooks run inside the dict operation that fired them and must not raise or
+modify the dict. When no hook is registered, the only cost is checking
+whether the registry is empty.
+"""
+
+from typing import Any, Callable, List, Tuple
+
+
+Hook = Callable[[str, Tuple[Any, ...]], None]
+
+RESIZE_START = "resize_start"
+RESIZE_END = "resize_end"
+RESIZE_ABORT = "resize_abort"
+FREE_UP = "free_up"
+NBHD_EXHAUSTED = "nbhd_exhausted"
+
+# Checked directly by HopscotchDict before doing any work to fire an event,
+# so it must only ever be modified in place
+_hooks: List[Hook] = []
+
+
+def add_hook(hook: Hook) -> None:
+	"""
+	Call the given function whenever a HopscotchDict fires an event
+
+	:param hook: The function to call with the event name and its arguments
+	"""
+	if not callable(hook):
+		raise TypeError("Hook must be callable")
+
+	_hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+	"""
+	Stop calling the given function when a HopscotchDict fires an event
+
+	:param hook: The function to stop calling
+	"""
+	try:
+		_hooks.remove(hook)
+	except ValueError:
+		raise ValueError("Hook {0!r} is not registered".format(hook)) from None
+
+
+def fire(event: str, *args: Any) -> None:
+	"""
+	Call every registered hook with the given event
+
+	:param event: The name of the event
+	:param args: The arguments describing the event
+	"""
+	# Hooks may unregister themselves while running
+	for hook in tuple(_hooks):
+		hook(event, args)
@@ -8,18 +8,24 @@
 ################################################################################
 
 from array import array
+from copy import deepcopy
 from functools import partial
-from struct import calcsize, pack, pack_into, unpack_from
-from sys import maxsize, version_info
+from sys import byteorder, maxsize, version_info
+from time import perf_counter
 from typing import (Any,
 					Callable,
 					cast,
+					Collection,
+					Dict,
 					Hashable,
 					ItemsView,
+					Iterable,
 					Iterator,
 					KeysView,
 					List,
+					Mapping,
 					MutableMapping,
+					MutableSequence,
 					Optional,
 					Set,
 					Tuple,
@@ -27,14 +33,35 @@ from typing import (Any,
 					ValuesView
 					)
 
+# Out-of-band pickle buffers were added in Python 3.8
+if version_info >= (3, 8):
+	from pickle import PickleBuffer
+
+from py_hopscotch_dict.hooks import (_hooks,
+									 fire,
+									 FREE_UP,
+									 NBHD_EXHAUSTED,
+									 RESIZE_ABORT,
+									 RESIZE_END,
+									 RESIZE_START
+									 )
 from py_hopscotch_dict.views import HDItems, HDKeys, HDValues
 
+# Differs between interpreters hashing strings differently, such as those
+# started with different values of PYTHONHASHSEED, and between processes
+# hashing None differently, since before Python 3.12 it hashes by address
+_HASH_CHECK = hash(("py_hopscotch_dict", None))
+
 
 class HopscotchDict(MutableMapping[Hashable, Any]):
 	# Prevent default creation of __dict__, which should save space if many
 	# instances of HopscotchDict are used at once
-	__slots__ = ("_count", "_keys", "_lookup_table", "_nbhd_size", "_pack_fmt",
-				 "_size", "_values")
+	__slots__ = ("_count", "_free_up_calls", "_free_up_failures",
+				 "_growth_factor", "_hashes", "_incremental", "_indices",
+				 "_keys", "_large_table_size", "_max_density",
+				 "_migration_idx", "_min_density", "_nbhd_size", "_nbhds",
+				 "_old_indices", "_old_nbhds", "_resizes", "_size",
+				 "_value_index", "_values")
 
 	# Python ints are signed, add one to get word length
 	MAX_NBHD_SIZE = maxsize.bit_length() + 1
@@ -45,9 +72,38 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 	# Sentinel value used in indices table to denote we can put value here
 	FREE_ENTRY = -1
 
-	# Maximum allowed density before resizing
+	# Default maximum allowed density before resizing
 	MAX_DENSITY = 0.8
 
+	# Default factor to grow small dicts by when resizing
+	GROWTH_FACTOR = 4
+
+	# Default size from which dicts only double when resizing
+	LARGE_TABLE_SIZE = 2 ** 16
+
+	# Maximum number of times a resize may double the requested size while
+	# trying to maintain the neighborhood invariant before giving up
+	MAX_RESIZE_ATTEMPTS = 8
+
+	# Number of slots of the old lookup table moved per operation while
+	# resizing incrementally
+	MIGRATION_BATCH_SIZE = 64
+
+	@staticmethod
+	def _build_lookup_table(hashes: array) -> Tuple[int, array, array]:
+		"""
+		Lay out the smallest lookup table that can hold entries with the given
+		hashes, without needing the entries themselves
+
+		:param hashes: The hashes of the entries, in the same order as the
+					   entries
+
+		:return: The neighborhood size of the table, and the arrays holding
+				 its indices and neighborhoods
+		"""
+		table = HopscotchDict()._lay_out(hashes)
+		return table._nbhd_size, table._indices, table._nbhds
+
 	@staticmethod
 	def _get_displaced_neighbors(lookup_idx: int,
 								 nbhd: int,
@@ -72,24 +128,42 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		elif lookup_idx >= max_size:
 			raise ValueError("Index {0} outside array".format(lookup_idx))
 
-		result = []
+		return list(HopscotchDict._iter_displaced_neighbors(
+			lookup_idx,
+			nbhd & ((1 << nbhd_size) - 1),
+			max_size))
 
-		for i in range(nbhd_size):
-			if nbhd & (1 << i) > 0:
-				result.append((lookup_idx + i) % max_size)
+	@staticmethod
+	def _iter_displaced_neighbors(lookup_idx: int,
+								  nbhd: int,
+								  max_size: int) -> Iterator[int]:
+		"""
+		Lazily yield the indices in _lookup_table marked in the given
+		neighborhood, visiting only the bits that are set
 
-		return result
+		:param lookup_idx: The index in _lookup_table the neighborhood belongs to
+		:param nbhd: The neighborhood at lookup_idx
+		:param max_size: The current maximum size of the dict
+
+		:return: Indices in _lookup_table that supposedly have data that would
+				 be stored at lookup_idx, nearest first
+		"""
+		while nbhd:
+			# Isolate the lowest set bit, then clear it
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			yield (lookup_idx + lowest_bit.bit_length() - 1) % max_size
 
 	@staticmethod
-	def _make_lookup_table(table_size: int) -> Tuple[bytearray, str]:
+	def _make_lookup_table(table_size: int) -> Tuple[array, array]:
 		"""
-		Make the array that holds the indices into _keys/_values and the
+		Make the arrays that hold the indices into _keys/_values and the
 		neighborhoods for each index
 
 		:param table_size: The number of entries of the returned table
 
-		:return: The desired table as a `bytearray` and the corresponding
-				 struct string necessary to read it
+		:return: The desired table as a pair of native-endian `array`s,
+				 holding the indices and neighborhoods respectively
 		"""
 		if table_size < 0:
 			raise ValueError("Lookup table cannot have negative length")
@@ -97,25 +171,46 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		table_log_size = table_size.bit_length()
 
 		if table_log_size < 8:
-			struct_fmt = "b B"
+			index_fmt, nbhd_fmt = "b", "B"
 		elif table_log_size < 16:
-			struct_fmt = ">h H"
+			index_fmt, nbhd_fmt = "h", "H"
 		elif table_log_size < 32:
-			struct_fmt = ">i I"
+			index_fmt, nbhd_fmt = "i", "I"
 		else:
-			struct_fmt = ">l L"								  # pragma: no cover
+			index_fmt, nbhd_fmt = "q", "Q"						  # pragma: no cover
+
+		return (array(index_fmt, [HopscotchDict.FREE_ENTRY]) * table_size,
+				array(nbhd_fmt, [0]) * table_size)
 
-		return (bytearray(pack(struct_fmt,
-							   HopscotchDict.FREE_ENTRY,
-							   0) * table_size),
-				struct_fmt)
+	@staticmethod
+	def _nbhd_size_for(table_size: int) -> int:
+		"""
+		Find the neighborhood size to use for a table of the given size
+
+		:param table_size: The number of entries of the table
+
+		:return: The smallest allowed neighborhood size at least as large as
+				 the base-2 logarithm of the table size
+		"""
+		# 2**k requires k+1 bits to represent, so subtract one
+		min_nbhd_size = table_size.bit_length() - 1
+
+		if min_nbhd_size > HopscotchDict.MAX_NBHD_SIZE:
+			raise ValueError("Resizing requires too-large neighborhood")
+
+		return min(s for s in HopscotchDict.ALLOWED_NBHD_SIZES
+				   if s >= min_nbhd_size)
 
 	def clear(self) -> None:
 		"""
 		Remove all the data from the dict and return it to its original size
 		"""
-		self._lookup_table: bytearray
-		self._pack_fmt: str
+		self._indices: array
+		self._nbhds: array
+		self._hashes: array
+		self._old_indices: Optional[array]
+		self._old_nbhds: Optional[array]
+		self._value_index: Optional[Dict[Any, Dict[Hashable, None]]]
 
 		# The total size of main dict, including empty spaces
 		self._size = 8
@@ -137,10 +232,46 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 			del self._keys
 		self._keys: List[Hashable] = []
 
+		# Hashes of stored keys, kept so keys never need rehashing
+		if hasattr(self, "_hashes"):
+			del self._hashes
+		self._hashes = array("q")
+
 		# Main table, storing auxiliary index and neighbors for each index
-		if hasattr(self, "_lookup_table"):
-			del self._lookup_table
-		self._lookup_table, self._pack_fmt = self._make_lookup_table(self._size)
+		if hasattr(self, "_indices"):
+			del self._indices
+			del self._nbhds
+		self._indices, self._nbhds = self._make_lookup_table(self._size)
+
+		# Lookup table being migrated away from during an incremental resize,
+		# and the next index in it to migrate
+		self._old_indices = None
+		self._old_nbhds = None
+		self._migration_idx = 0
+
+		# Reverse index of values, if enabled
+		if self._value_index is not None:
+			self._value_index = {}
+
+	@classmethod
+	def _slot_names(cls) -> List[str]:
+		"""
+		Find the names of the slots declared by this class and every class it
+		inherits from
+
+		:return: The names of the slots that can hold attributes
+		"""
+		names: List[str] = []
+
+		for klass in cls.__mro__:
+			slots = klass.__dict__.get("__slots__", ())
+			if isinstance(slots, str):
+				slots = (slots,)
+
+			names.extend(attr for attr in slots
+						 if attr not in {"__dict__", "__weakref__"})
+
+		return names
 
 	def _clear_neighbor(self, lookup_idx: int, nbhd_idx: int) -> None:
 		"""
@@ -158,18 +289,47 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		elif nbhd_idx >= self._nbhd_size:
 			raise ValueError("Trying to clear neighbor outside neighborhood")
 
-		lookup_offset = calcsize(self._pack_fmt) * lookup_idx
-		value_idx, nbhd = unpack_from(self._pack_fmt,
-									  self._lookup_table,
-									  lookup_offset)
+		self._nbhds[lookup_idx] &= ~(1 << nbhd_idx)
+
+	def _clone(self, keys: List[Hashable], values: List[Any]) -> "HopscotchDict":
+		"""
+		Create a new instance of the same type and configuration as this one,
+		using the given keys and values with this instance's lookup table
+
+		:param keys: The keys for the new instance, in the same order as _keys
+		:param values: The values for the new instance, in the same order as
+					   _values
+
+		:returns: A new instance sharing nothing mutable with this one
+		"""
+		cls = self.__class__
+		out = cls.__new__(cls)
+
+		# Subclasses may declare slots of their own, which are copied along
+		# with these
+		for attr in self._slot_names():
+			if hasattr(self, attr):
+				setattr(out, attr, getattr(self, attr))
+
+		out._keys = keys
+		out._values = values
+		out._hashes = self._hashes[:]
+		out._indices = self._indices[:]
+		out._nbhds = self._nbhds[:]
 
-		nbhd &= ~(1 << nbhd_idx)
+		if self._old_indices is not None:
+			out._old_indices = self._old_indices[:]
+			out._old_nbhds = cast(array, self._old_nbhds)[:]
 
-		pack_into(self._pack_fmt,
-				  self._lookup_table,
-				  lookup_offset,
-				  value_idx,
-				  nbhd)
+		# The new instance hasn't done any of the work behind these
+		out._free_up_calls = 0
+		out._free_up_failures = 0
+		out._resizes = 0
+
+		if self._value_index is not None:
+			out._index_values()
+
+		return out
 
 	def _free_up(self, target_idx: int) -> None:
 		"""
@@ -184,6 +344,8 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		elif target_idx >= self._size:
 			raise ValueError("Index {0} outside array".format(target_idx))
 
+		self._free_up_calls += 1
+
 		# Attempting to free an index with an open neighbor is a no-op
 		if self._get_open_neighbor(target_idx) is not None:
 			return
@@ -192,7 +354,7 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 			return (curr - exp) % self._size
 
 		data_idx, _ = self._get_lookup_index_info(target_idx)
-		entry_expected_idx = abs(hash(self._keys[data_idx])) % self._size
+		entry_expected_idx = abs(self._hashes[data_idx]) % self._size
 
 		# It is possible the entry in _lookup_table at target_idx is a displaced
 		# neighbor of some prior index; if that's the case see if there is an
@@ -216,10 +378,13 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 				# commented form of that code for now in case it breaks
 				# something in testing
 				# self._clear_neighbor(target_idx, 0)
+				if _hooks:
+					fire(FREE_UP, target_idx, 1)
 				return
 
 		# Walking down the array for an empty spot and shuffling entries around
 		# is the only way
+		hops = 0
 		lookup_idx = target_idx + self._nbhd_size
 		while target_idx + self._nbhd_size <= lookup_idx < self._size:
 			nearest_neighbor = self._get_open_neighbor(lookup_idx)
@@ -254,6 +419,7 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 					self._set_neighbor(idx, nearest_nbhd_idx)
 					self._clear_neighbor(idx, closest_nbhd_idx)
 					lookup_idx = entry_idx
+					hops += 1
 					break
 
 				# If the last index before the open index has no displaced
@@ -262,14 +428,23 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 				# with data displaced from other indices, and the invariant
 				# cannot be maintained without a resize
 				elif idx == nearest_neighbor - 1:
+					self._free_up_failures += 1
+					if _hooks:
+						fire(NBHD_EXHAUSTED, target_idx, self._size,
+							 self._nbhd_size)
 					raise RuntimeError(("No space available before open index"))
 
 			# If the index that had its data punted is inside the target index's
 			# neighborhood, the success condition has been attained
 			if _disp_dist(lookup_idx, target_idx) < self._nbhd_size:
+				if _hooks:
+					fire(FREE_UP, target_idx, hops)
 				return
 
 		# No open indices exist between the given index and the end of the array
+		self._free_up_failures += 1
+		if _hooks:
+			fire(NBHD_EXHAUSTED, target_idx, self._size, self._nbhd_size)
 		raise RuntimeError("Could not open index while maintaining invariant")
 
 	def _get_lookup_index_info(self,
@@ -289,17 +464,11 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		elif lookup_idx >= self._size:
 			raise ValueError("Index {0} outside array".format(lookup_idx))
 
-		lookup_offset = calcsize(self._pack_fmt) * lookup_idx
-
-		data_idx, nbhd = unpack_from(self._pack_fmt,
-									 self._lookup_table,
-									 lookup_offset)
-
 		neighbors = self._get_displaced_neighbors(lookup_idx,
-												  nbhd,
+												  self._nbhds[lookup_idx],
 												  self._nbhd_size,
 												  self._size)
-		return data_idx, neighbors
+		return self._indices[lookup_idx], neighbors
 
 	def _get_open_neighbor(self, lookup_idx: int) -> Optional[int]:
 		"""
@@ -327,39 +496,466 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 
 		return result
 
-	def _lookup(self, key: Hashable) -> Tuple[Optional[int], Optional[int]]:
+	def _grow(self) -> None:
+		"""
+		Grow the dict to its next size, either all at once or by starting an
+		incremental resize
+		"""
+		if not self._incremental:
+			self._rebuild(self._next_size())
+			return
+
+		# Finish any migration still in progress before starting another
+		if self._old_indices is not None:
+			self._migrate(len(self._old_indices))
+
+		new_size = self._next_size()
+		old_size = self._size
+		self._resizes += 1
+
+		# Hooks registered partway through a resize only see the next one
+		hooked = bool(_hooks)
+		if hooked:
+			fire(RESIZE_START, old_size, new_size, self._count)
+			start_time = perf_counter()
+
+		self._old_indices = self._indices
+		self._old_nbhds = self._nbhds
+		self._migration_idx = 0
+
+		self._nbhd_size = self._nbhd_size_for(new_size)
+		self._size = new_size
+		self._indices, self._nbhds = self._make_lookup_table(new_size)
+
+		if hooked:
+			fire(RESIZE_END, old_size, new_size, self._count,
+				 perf_counter() - start_time)
+
+	def _has_value(self, value: Any) -> bool:
+		"""
+		Check whether any key maps to the given value, using the reverse index
+		of values if the dict has one and the value is hashable
+
+		:param value: The value to search for
+
+		:return: True if the value is stored, False otherwise
+		"""
+		if self._value_index is not None:
+			try:
+				return value in self._value_index
+			except TypeError:
+				pass
+
+		return value in self._values
+
+	def _index_value(self, key: Hashable, value: Any) -> None:
+		"""
+		Record the given key under the given value in the reverse index of
+		values; values that can't be hashed are left out
+
+		:param key: The key the value is stored under
+		:param value: The value to index
+		"""
+		try:
+			keys = cast(Dict[Any, Dict[Hashable, None]],
+						self._value_index).setdefault(value, {})
+		except TypeError:
+			return
+
+		keys[key] = None
+
+	def _index_values(self) -> None:
+		"""
+		Build the reverse index of values from scratch
+		"""
+		self._value_index = {}
+
+		for key, value in zip(self._keys, self._values):
+			self._index_value(key, value)
+
+	def _lay_out(self, hashes: array) -> "HopscotchDict":
+		"""
+		Lay out a lookup table for entries with the given hashes, in a new
+		instance with this one's growth policy that holds nothing else
+
+		:param hashes: The hashes of the entries, in the same order as the
+					   entries
+
+		:return: The new instance, whose lookup table holds every entry
+		"""
+		table = HopscotchDict(max_density=self._max_density,
+							  growth_factor=self._growth_factor,
+							  large_table_size=self._large_table_size)
+		table._hashes = hashes
+		table._count = len(hashes)
+
+		try:
+			table._rebuild(table._min_size_for(table._count))
+		except RuntimeError:
+			# Clustered hashes may need a far larger table than a single
+			# rebuild tries, which placing the entries one at a time grows to
+			# the same way inserting them would
+			table.clear()
+
+			for key_hash in hashes:
+				table._hashes.append(key_hash)
+				table._count += 1
+
+				if not table._place(table._count - 1, key_hash):
+					table._rebuild(table._next_size())
+
+				if table._count / table._size >= table._max_density:
+					table._grow()
+
+		return table
+
+	def _lookup(self,
+				key: Hashable,
+				key_hash: Optional[int]=None
+				) -> Tuple[Optional[int], Optional[int]]:
 		"""
 		Find the indices in _lookup_table and _keys that correspond to the given
 		key
 
 		:param key: The key to search for in the dict
+		:param key_hash: The hash of the key, if already known
 
 		:return: The index in _lookup_table that holds the index to _keys for
 				 the given key and the index to _keys, or None for both if the
 				 key has not been inserted
 		"""
-		data_idx = None
-		lookup_idx = None
+		if key_hash is None:
+			key_hash = hash(key)
 
-		_, neighbors = self._get_lookup_index_info(abs(hash(key)) % self._size)
+		# Indices computed here are always in range, so the table is read
+		# directly instead of through the validating helpers
+		size = self._size
+		expected_lookup_idx = abs(key_hash) % size
+		nbhd = self._nbhds[expected_lookup_idx]
 
-		for neighbor in neighbors:
-			nbr_data_idx, _ = self._get_lookup_index_info(neighbor)
+		# Only visit occupied neighbors, nearest first
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			lookup_idx = (expected_lookup_idx + lowest_bit.bit_length() - 1) % size
+			data_idx = self._indices[lookup_idx]
 
-			if nbr_data_idx < 0:
+			if data_idx < 0:
 				raise RuntimeError((
 					"Index {0} has supposed displaced neighbor that points to "
-					"free index").format(abs(hash(key)) % self._size))
+					"free index").format(expected_lookup_idx))
 
-			if self._keys[nbr_data_idx] == key:
-					data_idx = nbr_data_idx
-					lookup_idx = neighbor
-					break
+			# Only compare keys whose hashes match, like the builtin dict
+			nbr_key = self._keys[data_idx]
+			if nbr_key is key or (self._hashes[data_idx] == key_hash
+								  and nbr_key == key):
+				return (lookup_idx, data_idx)
 
-		if data_idx is None:
-			lookup_idx = None
+		if self._old_indices is not None:
+			return self._lookup_old(key, key_hash)
+
+		return (None, None)
+
+	def _lookup_old(self,
+					key: Hashable,
+					key_hash: int) -> Tuple[Optional[int], Optional[int]]:
+		"""
+		Find the given key in the lookup table being migrated away from, and
+		move it to the current lookup table if it is there
+
+		:param key: The key to search for in the dict
+		:param key_hash: The hash of the key
+
+		:return: The index in _lookup_table that now holds the index to _keys
+				 for the given key and the index to _keys, or None for both if
+				 the key has not been inserted
+		"""
+		old_indices = cast(array, self._old_indices)
+		old_nbhds = cast(array, self._old_nbhds)
+		old_size = len(old_indices)
+		expected_lookup_idx = abs(key_hash) % old_size
+		nbhd = old_nbhds[expected_lookup_idx]
+
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			lookup_idx = (expected_lookup_idx + lowest_bit.bit_length() - 1) % old_size
+			data_idx = old_indices[lookup_idx]
+
+			nbr_key = self._keys[data_idx]
+			if nbr_key is key or (self._hashes[data_idx] == key_hash
+								  and nbr_key == key):
+				# Whether moved on its own or by a full resize of the dict, the
+				# entry is now in the current table
+				self._migrate_entry(lookup_idx)
+				return self._lookup(key, key_hash)
+
+		return (None, None)
+
+	def _lookup_for_removal(self,
+							key: Hashable
+							) -> Tuple[Optional[int], Optional[int]]:
+		"""
+		Find the indices of the given key like `_lookup`, ready to be passed to
+		`_remove`
+
+		:param key: The key to search for in the dict
+
+		:return: The index in _lookup_table that holds the index to _keys for
+				 the given key and the index to _keys, or None for both if the
+				 key has not been inserted
+		"""
+		if self._old_indices is not None:
+			self._migrate(self.MIGRATION_BATCH_SIZE)
+
+		# Looking up an entry moves it to the current lookup table, so the tail
+		# entry that may be moved on removal is brought over before the key,
+		# whose position could otherwise change
+		if self._old_indices is not None and self._count:
+			self._lookup(self._keys[-1], self._hashes[-1])
+
+		return self._lookup(key)
+
+	def _migrate(self, slot_count: int) -> None:
+		"""
+		Move the entries in the given number of slots of the lookup table being
+		migrated away from to the current lookup table, finishing the
+		migration once every slot has been moved
+
+		:param slot_count: The number of slots to migrate
+		"""
+		old_indices = cast(array, self._old_indices)
+		stop_idx = min(self._migration_idx + slot_count, len(old_indices))
+
+		for lookup_idx in range(self._migration_idx, stop_idx):
+			if old_indices[lookup_idx] != self.FREE_ENTRY:
+				# A full resize of the dict also finishes the migration
+				if not self._migrate_entry(lookup_idx):
+					return
+
+		self._migration_idx = stop_idx
+
+		if stop_idx == len(old_indices):
+			self._old_indices = None
+			self._old_nbhds = None
+			self._migration_idx = 0
+
+	def _migrate_entry(self, old_lookup_idx: int) -> bool:
+		"""
+		Move the entry at the given slot of the lookup table being migrated
+		away from to the current lookup table, resizing the dict if the entry
+		can't be placed while maintaining the neighborhood invariant
+
+		:param old_lookup_idx: The index in the old lookup table to move
+
+		:return: True if the entry was moved, False if the dict was resized
+		"""
+		old_indices = cast(array, self._old_indices)
+		old_nbhds = cast(array, self._old_nbhds)
+		old_size = len(old_indices)
+		data_idx = old_indices[old_lookup_idx]
+		key_hash = self._hashes[data_idx]
+
+		# The entry stays in the old table until it has been placed, so a
+		# failed resize leaves it where it was
+		if not self._place(data_idx, key_hash):
+			self._rebuild(self._next_size())
+			return False
+
+		expected_lookup_idx = abs(key_hash) % old_size
+		nbhd_idx = (old_lookup_idx - expected_lookup_idx) % old_size
+		old_nbhds[expected_lookup_idx] &= ~(1 << nbhd_idx)
+		old_indices[old_lookup_idx] = self.FREE_ENTRY
+		return True
+
+	def _min_size_for(self, count: int) -> int:
+		"""
+		Find the smallest table size that can hold the given number of entries
+		without exceeding the maximum density
+
+		:param count: The number of entries the table must hold
+
+		:return: The smallest power of 2 that can hold that many entries
+		"""
+		size = 8
+
+		while count / size >= self._max_density:
+			size *= 2
+
+		return size
+
+	def _next_size(self) -> int:
+		"""
+		Find the size the dict should grow to on its next resize
+
+		:return: The current size multiplied by the growth factor, or doubled
+				 if the dict is already large
+		"""
+		if self._size < self._large_table_size:
+			return self._size * self._growth_factor
+		else:
+			return self._size * 2
+
+	def _place(self, data_idx: int, key_hash: int) -> bool:
+		"""
+		Store the given index into _keys/_values in the neighborhood of the slot
+		its hash maps to, freeing up a neighbor if necessary
+
+		:param data_idx: The index into _keys/_values to store
+		:param key_hash: The hash of the key at that index
+
+		:return: True if the index was stored, False if it can't be without
+				 resizing the dict
+		"""
+		size = self._size
+		expected_lookup_idx = abs(key_hash) % size
+		indices = self._indices
+		nearest_nbr: Optional[int] = None
+
+		for nbhd_idx in range(self._nbhd_size):
+			lookup_idx = (expected_lookup_idx + nbhd_idx) % size
+			if indices[lookup_idx] == self.FREE_ENTRY:
+				nearest_nbr = lookup_idx
+				break
+		else:
+			try:
+				self._free_up(expected_lookup_idx)
+				nearest_nbr = self._get_open_neighbor(expected_lookup_idx)
+			except RuntimeError:
+				pass
+
+		if nearest_nbr is None:
+			return False
+
+		nbhd_idx = (nearest_nbr - expected_lookup_idx) % size
+		self._nbhds[expected_lookup_idx] |= 1 << nbhd_idx
+		indices[nearest_nbr] = data_idx
+		return True
+
+	def _rebuild(self, new_size: int, max_size: Optional[int]=None) -> None:
+		"""
+		Resize the dict to at least the given size, doubling it until every
+		entry can be placed while maintaining the neighborhood invariant
+
+		:param new_size: The smallest acceptable new size of the dict
+		:param max_size: The largest acceptable new size of the dict, or None
+						 to allow any size the doubling reaches
+		"""
+		old_table = (self._size, self._nbhd_size, self._indices, self._nbhds,
+					 self._old_indices, self._old_nbhds, self._migration_idx)
+
+		try:
+			for _ in range(self.MAX_RESIZE_ATTEMPTS):
+				if max_size is not None and new_size > max_size:
+					raise RuntimeError((
+						"Could not maintain neighborhood invariant in a table "
+						"of at most {0} entries").format(max_size))
+
+				try:
+					self._resize(new_size)
+					return
+				except RuntimeError:
+					new_size *= 2
 
-		return (lookup_idx, data_idx)
+			raise RuntimeError((
+				"Could not maintain neighborhood invariant after {0} resizes; "
+				"too many keys share the same hash").format(
+					self.MAX_RESIZE_ATTEMPTS))
+
+		# Leave the dict as it was rather than with a partially-built table
+		except BaseException:
+			(self._size,
+			 self._nbhd_size,
+			 self._indices,
+			 self._nbhds,
+			 self._old_indices,
+			 self._old_nbhds,
+			 self._migration_idx) = old_table
+			raise
+
+	def _remove(self, lookup_idx: int, data_idx: int) -> None:
+		"""
+		Remove the entry found by `_lookup_for_removal` at the given indices
+
+		:param lookup_idx: The index in _lookup_table pointing to the entry
+		:param data_idx: The index of the entry in _keys/_values
+		"""
+		if self._value_index is not None:
+			self._unindex_value(self._keys[data_idx], self._values[data_idx])
+
+		size = self._size
+
+		# The index key should map to in _lookup_table
+		expected_lookup_idx = abs(self._hashes[data_idx]) % size
+
+		# If the key and its associated value aren't the last entries in
+		# their respective lists, swap with the last entries to not leave a
+		# hole in said lists
+		tail_data_idx = self._count - 1
+
+		if data_idx != tail_data_idx:
+			self._repoint(tail_data_idx, data_idx)
+
+			# Move the data to be removed to the end of each list and update
+			# indices
+			self._keys[data_idx] = self._keys[tail_data_idx]
+			self._values[data_idx] = self._values[tail_data_idx]
+			self._hashes[data_idx] = self._hashes[tail_data_idx]
+
+		# Update the neighborhood of the index the key to be removed is
+		# supposed to point to, since the key to be removed must be
+		# somewhere in it
+		nbhd_idx = (lookup_idx - expected_lookup_idx) % size
+		self._nbhds[expected_lookup_idx] &= ~(1 << nbhd_idx)
+
+		# Remove the last item from the variable tables, either the actual
+		# data to be removed or what was originally at the end before
+		# it was copied over the data to be removed
+		del self._keys[-1]
+		del self._values[-1]
+		del self._hashes[-1]
+		self._indices[lookup_idx] = self.FREE_ENTRY
+		self._count -= 1
+
+		# Shrink to a size that leaves room to grow again before the next
+		# resize, so alternating inserts and deletes don't thrash, unless
+		# that size would still be below the minimum density
+		if self._count < self._size * self._min_density and self._size > 8:
+			new_size = self._min_size_for(self._count * 2)
+
+			if self._count < new_size * self._min_density:
+				new_size = self._min_size_for(self._count)
+
+			self._shrink(new_size)
+
+	def _repoint(self, data_idx: int, new_data_idx: int) -> None:
+		"""
+		Point the slot of the lookup table holding the given index into
+		_keys/_values at another index, or free it
+
+		:param data_idx: The index into _keys/_values to search for
+		:param new_data_idx: The index to store in its place, or FREE_ENTRY to
+							 remove it from the table
+		"""
+		size = self._size
+		expected_lookup_idx = abs(self._hashes[data_idx]) % size
+		nbhd = self._nbhds[expected_lookup_idx]
+
+		# The entry is found by its index rather than by comparing keys,
+		# since only one slot can point to it
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			lookup_idx = (expected_lookup_idx + lowest_bit.bit_length() - 1) % size
+
+			if self._indices[lookup_idx] == data_idx:
+				self._indices[lookup_idx] = new_data_idx
+				if new_data_idx == self.FREE_ENTRY:
+					self._nbhds[expected_lookup_idx] ^= lowest_bit
+				return
+
+		raise RuntimeError("Index {0} missing from lookup table"
+						   .format(data_idx))
 
 	def _resize(self, new_size: int) -> None:
 		"""
@@ -371,33 +967,84 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		if new_size & new_size - 1:
 			raise ValueError("New size for dict not a power of 2")
 
-		# Neighborhoods must be at least as large as the base-2 logarithm of
-		# the dict size
+		old_size = self._size
+		old_table = (self._size, self._nbhd_size, self._indices, self._nbhds)
 
-		# 2**k requires k+1 bits to represent, so subtract one
-		resized_nbhd_size = new_size.bit_length() - 1
+		# Hooks registered partway through a resize only see the next one
+		hooked = bool(_hooks)
+		if hooked:
+			fire(RESIZE_START, old_size, new_size, self._count)
+			start_time = perf_counter()
 
-		if resized_nbhd_size > self._nbhd_size:
-			if resized_nbhd_size > self.MAX_NBHD_SIZE:
-				raise ValueError("Resizing requires too-large neighborhood")
-			self._nbhd_size = min(s for s in self.ALLOWED_NBHD_SIZES
-								  if s >= resized_nbhd_size)
+		try:
+			# Neighborhoods must be at least as large as the base-2 logarithm
+			# of the dict size; they also shrink along with the dict, since
+			# the lookup table for a smaller dict may not be able to store
+			# larger ones
+			self._nbhd_size = self._nbhd_size_for(new_size)
+
+			self._size = new_size
+			self._indices, self._nbhds = self._make_lookup_table(self._size)
+
+			indices = self._indices
+			nbhds = self._nbhds
+			nbhd_size = self._nbhd_size
+
+			for data_idx, key_hash in enumerate(self._hashes):
+				expected_lookup_idx = abs(key_hash) % new_size
+
+				for nbhd_idx in range(nbhd_size):
+					nearest_neighbor = ((expected_lookup_idx + nbhd_idx)
+										% new_size)
+					if indices[nearest_neighbor] == self.FREE_ENTRY:
+						break
+				else:
+					self._free_up(expected_lookup_idx)
+					nearest_neighbor = cast(int, self._get_open_neighbor(
+						expected_lookup_idx))
+					nbhd_idx = ((nearest_neighbor - expected_lookup_idx)
+								 % new_size)
 
-		self._size = new_size
-		self._lookup_table, self._pack_fmt = self._make_lookup_table(self._size)
+				nbhds[expected_lookup_idx] |= 1 << nbhd_idx
+				indices[nearest_neighbor] = data_idx
 
-		for data_idx, key in enumerate(self._keys):
-			expected_lookup_idx = abs(hash(key)) % self._size
+		# Put the old table back, so a retry at another size starts from it
+		except BaseException:
+			(self._size, self._nbhd_size, self._indices,
+			 self._nbhds) = old_table
 
-			nearest_neighbor = self._get_open_neighbor(expected_lookup_idx)
-			if nearest_neighbor is None:
-				self._free_up(expected_lookup_idx)
-				nearest_neighbor = self._get_open_neighbor(expected_lookup_idx)
-				nearest_neighbor = cast(int, nearest_neighbor)
-			nbhd_idx = ((nearest_neighbor - expected_lookup_idx)
-						 % self._size)
-			self._set_neighbor(expected_lookup_idx, nbhd_idx)
-			self._set_lookup_index_info(nearest_neighbor, data=data_idx)
+			if hooked:
+				fire(RESIZE_ABORT, old_size, new_size, self._count,
+					 perf_counter() - start_time)
+			raise
+
+		self._resizes += 1
+
+		# Every entry is now in the new table, including any that had yet to
+		# be migrated from an incremental resize
+		self._old_indices = None
+		self._old_nbhds = None
+		self._migration_idx = 0
+
+		if hooked:
+			fire(RESIZE_END, old_size, new_size, self._count,
+				 perf_counter() - start_time)
+
+	def _shrink(self, new_size: int) -> None:
+		"""
+		Shrink the dict to the given size, or to the smallest size below its
+		current one that can hold every entry; shrinking only saves memory, so
+		the dict is left as it was if no smaller table can hold every entry
+
+		:param new_size: The smallest acceptable new size of the dict
+		"""
+		if new_size >= self._size:
+			return
+
+		try:
+			self._rebuild(new_size, self._size // 2)
+		except RuntimeError:
+			pass
 
 	def _set_lookup_index_info(self,
 							   lookup_idx: int,
@@ -415,22 +1062,11 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		elif lookup_idx >= self._size:
 			raise ValueError("Index {0} outside array".format(lookup_idx))
 
-		lookup_offset = calcsize(self._pack_fmt) * lookup_idx
-		data_idx, neighbors = unpack_from(self._pack_fmt,
-										  self._lookup_table,
-										  lookup_offset)
-
 		if data is not None:
-			data_idx = data
+			self._indices[lookup_idx] = data
 
 		if nbhd is not None:
-			neighbors = nbhd
-
-		pack_into(self._pack_fmt,
-				  self._lookup_table,
-				  lookup_offset,
-				  data_idx,
-				  neighbors)
+			self._nbhds[lookup_idx] = nbhd
 
 	def _set_neighbor(self, lookup_idx: int, nbhd_idx: int) -> None:
 		"""
@@ -447,28 +1083,90 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		elif nbhd_idx >= self._nbhd_size:
 			raise ValueError("Trying to clear neighbor outside neighborhood")
 
-		lookup_offset = calcsize(self._pack_fmt) * lookup_idx
-		value_idx, nbhd = unpack_from(self._pack_fmt,
-									  self._lookup_table,
-									  lookup_offset)
+		self._nbhds[lookup_idx] |= (1 << nbhd_idx)
+
+	def _unindex_value(self, key: Hashable, value: Any) -> None:
+		"""
+		Remove the given key from under the given value in the reverse index
+		of values
+
+		:param key: The key the value is stored under
+		:param value: The value to stop indexing the key under
+		"""
+		index = cast(Dict[Any, Dict[Hashable, None]], self._value_index)
+
+		try:
+			keys = index[value]
+		except (KeyError, TypeError):
+			return
+
+		keys.pop(key, None)
+		if not keys:
+			del index[value]
+
+	def compact(self) -> None:
+		"""
+		Shrink the dict to the smallest size that can hold its current entries,
+		releasing the memory used by the rest of the lookup table
+		"""
+		self._shrink(self._min_size_for(self._count))
+
+	def contains_many(self,
+					  keys: Iterable[Hashable],
+					  out: Optional[MutableSequence[bool]]=None
+					  ) -> MutableSequence[bool]:
+		"""
+		Check whether each of the given keys exists, in a single pass that
+		avoids a method call per key
+
+		:param keys: The keys to check for existence
+		:param out: A sequence at least as long as keys to store the results
+					in, or None to create a new list
+
+		:returns: A sequence whose nth element is True if the nth key exists
+				  and False if it does not
+		"""
+		# Values are never this object, so any key given it doesn't exist
+		missing = object()
+		found = self.get_many(keys, missing)
+
+		if out is None:
+			return [value is not missing for value in found]
 
-		nbhd |= (1 << nbhd_idx)
+		for out_idx, value in enumerate(found):
+			out[out_idx] = value is not missing
 
-		pack_into(self._pack_fmt,
-				  self._lookup_table,
-				  lookup_offset,
-				  value_idx,
-				  nbhd)
+		return out
+
+	def copy(self) -> "HopscotchDict":
+		"""
+		Create a shallow copy of the dict, of the same type and with the same
+		configuration
 
-	def copy(self) -> MutableMapping[Hashable, Any]:
+		:returns: A new instance containing the same keys and values
 		"""
-		Create a new instance with all items inserted
+		out = self._clone(self._keys[:], self._values[:])
+
+		if hasattr(self, "__dict__"):
+			out.__dict__.update(self.__dict__)
+
+		return out
+
+	@classmethod
+	def fromkeys(cls,
+				 iterable: Iterable[Hashable],
+				 value: Any=None) -> "HopscotchDict":
 		"""
-		out = HopscotchDict()
+		Create a new instance mapping every key in the given iterable to the
+		given value
 
-		for key in self._keys:
-			out[key] = self.__getitem__(key)
+		:param iterable: The keys to insert
+		:param value: The value every key maps to
 
+		:returns: A new instance containing the given keys
+		"""
+		out = cls()
+		out.update(dict.fromkeys(iterable, value))
 		return out
 
 	def get(self, key: Hashable, default: Any=None) -> Any:
@@ -489,6 +1187,66 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 			pass
 		return out
 
+	def get_many(self,
+				 keys: Iterable[Hashable],
+				 default: Any=None,
+				 out: Optional[MutableSequence[Any]]=None) -> MutableSequence[Any]:
+		"""
+		Retrieve the values corresponding to each of the given keys in a single
+		pass that avoids a method call per key
+
+		:param keys: The keys to retrieve data from
+		:param default: The value to return for keys that do not exist
+		:param out: A sequence at least as long as keys to store the values
+					in, or None to create a new list
+
+		:returns: A sequence whose nth element is the value of the nth key if
+				  it exists, or the default value if it does not
+		"""
+		if not isinstance(keys, Collection):
+			keys = list(keys)
+
+		if out is None:
+			out = [default] * len(keys)
+
+		size = self._size
+		indices = self._indices
+		nbhds = self._nbhds
+		stored_keys = self._keys
+		values = self._values
+		hashes = self._hashes
+		migrating = self._old_indices is not None
+
+		for out_idx, key in enumerate(keys):
+			key_hash = hash(key)
+			expected_lookup_idx = abs(key_hash) % size
+			nbhd = nbhds[expected_lookup_idx]
+			found_idx = None
+
+			while nbhd:
+				lowest_bit = nbhd & -nbhd
+				nbhd ^= lowest_bit
+				data_idx = indices[(expected_lookup_idx
+									+ lowest_bit.bit_length() - 1) % size]
+
+				nbr_key = stored_keys[data_idx]
+				if nbr_key is key or (hashes[data_idx] == key_hash
+									  and nbr_key == key):
+					found_idx = data_idx
+					break
+
+			# Moving a key out of the old table may resize the dict
+			if found_idx is None and migrating:
+				found_idx = self._lookup_old(key, key_hash)[1]
+				size = self._size
+				indices = self._indices
+				nbhds = self._nbhds
+				migrating = self._old_indices is not None
+
+			out[out_idx] = default if found_idx is None else values[found_idx]
+
+		return out
+
 	def has_key(self, key: Hashable) -> bool:
 		"""
 		Check if the given key exists
@@ -507,6 +1265,25 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		"""
 		return HDKeys(self)
 
+	def keys_for_value(self, value: Any) -> List[Hashable]:
+		"""
+		Find every key mapped to the given value, in no particular order; this
+		takes constant time if the dict indexes its values and the value is
+		hashable, and a scan of every value otherwise
+
+		:param value: The value to search for
+
+		:returns: A list of the keys whose values equal the given value
+		"""
+		if self._value_index is not None:
+			try:
+				return list(self._value_index.get(value, ()))
+			except TypeError:
+				pass
+
+		return [key for (key, val) in zip(self._keys, self._values)
+				if val is value or val == value]
+
 	def values(self) -> ValuesView[Any]:
 		"""
 		An iterator over all values in the dict
@@ -535,14 +1312,44 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		:returns: The value associated with the key if it exists, the default
 				  value if it does not
 		"""
-		out = default
-		try:
-			out = self.__getitem__(key)
-		except KeyError:
+		lookup_idx, data_idx = self._lookup_for_removal(key)
+
+		if data_idx is None:
 			if default is None:
-				raise
-		else:
-			self.__delitem__(key)
+				raise KeyError(key)
+			return default
+
+		out = self._values[data_idx]
+		self._remove(cast(int, lookup_idx), data_idx)
+		return out
+
+	def pop_many(self,
+				 keys: Iterable[Hashable],
+				 default: Any=None) -> List[Any]:
+		"""
+		Remove each of the given keys, returning their values; errors on the
+		first key that does not exist if no default value was given, leaving
+		any keys before it removed
+
+		:param keys: The keys to remove
+		:param default: The value to return for keys that do not exist
+
+		:returns: A list whose nth element is the value of the nth key if it
+				  existed, or the default value if it did not
+		"""
+		out = []
+
+		for key in keys:
+			lookup_idx, data_idx = self._lookup_for_removal(key)
+
+			if data_idx is None:
+				if default is None:
+					raise KeyError(key)
+				out.append(default)
+			else:
+				out.append(self._values[data_idx])
+				self._remove(cast(int, lookup_idx), data_idx)
+
 		return out
 
 	def popitem(self) -> Tuple[Hashable, Any]:
@@ -559,6 +1366,21 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 			val = self.pop(self._keys[-1])
 			return (key, val)
 
+	def reserve(self, count: int) -> None:
+		"""
+		Grow the dict so it can hold the given number of entries without
+		needing to resize again
+
+		:param count: The number of entries the dict should be able to hold
+		"""
+		if count < 0:
+			raise ValueError("Cannot reserve space for negative entries")
+
+		new_size = self._min_size_for(count)
+
+		if new_size > self._size:
+			self._rebuild(new_size)
+
 	def setdefault(self, key: Hashable, default: Any=None) -> Any:
 		"""
 		Return the value associated with the given key if it exists,
@@ -577,14 +1399,219 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 			self.__setitem__(key, default)
 			return default
 
-	def __init__(self, *args: Any, **kwargs: Any) -> None:
+	def stats(self) -> Dict[str, Any]:
+		"""
+		Report how full the dict's neighborhoods are and how much work has
+		gone into keeping them that way
+
+		The displacement histogram and full neighborhood count are computed
+		on each call by walking the lookup table; the remaining counters are
+		kept up to date as the dict is used
+
+		:returns: A dict containing the number of entries, the size of the
+				  lookup table, the load factor, the neighborhood size,
+				  a list whose nth element is the number of entries n indices
+				  away from their expected index, the number of indices whose
+				  neighborhoods have no open slots, the number of times
+				  _free_up was called and failed, and the number of resizes
+		"""
+		displacements = [0] * self._nbhd_size
+		full_nbhds = 0
+
+		tables = [self._indices]
+		if self._old_indices is not None:
+			tables.append(self._old_indices)
+
+		for indices in tables:
+			size = len(indices)
+			nbhd_size = self._nbhd_size_for(size)
+			run = 0
+			first_free = None
+
+			for lookup_idx, data_idx in enumerate(indices):
+				if data_idx == self.FREE_ENTRY:
+					if first_free is None:
+						first_free = lookup_idx
+					else:
+						full_nbhds += max(0, run - nbhd_size + 1)
+					run = 0
+					continue
+
+				run += 1
+				expected_idx = abs(self._hashes[data_idx]) % size
+				displacements[(lookup_idx - expected_idx) % size] += 1
+
+			# The run of occupied indices at the end of the table wraps around
+			# to the one at the start
+			if first_free is None:
+				full_nbhds += size
+			else:
+				full_nbhds += max(0, run + first_free - nbhd_size + 1)
+
+		return {
+			"count": self._count,
+			"size": self._size,
+			"load_factor": self._count / self._size,
+			"nbhd_size": self._nbhd_size,
+			"displacements": displacements,
+			"full_nbhds": full_nbhds,
+			"free_up_calls": self._free_up_calls,
+			"free_up_failures": self._free_up_failures,
+			"resizes": self._resizes,
+			}
+
+	def update(self, *args: Any, **kwargs: Any) -> None:
+		"""
+		Insert all the given items, growing the table at most once to fit
+		everything instead of once per crossing of the maximum density
+
+		:param args: A mapping or iterable of `(key, value)` pairs
+		:param kwargs: Additional items to insert
+		"""
+		if len(args) > 1:
+			raise TypeError("update expected at most 1 argument, got {0}"
+							.format(len(args)))
+
+		# Collapse duplicate keys up front, keeping the last value for each
+		if not args:
+			pending = {}
+		elif isinstance(args[0], HopscotchDict):
+			pending = dict(zip(args[0]._keys, args[0]._values))
+		else:
+			pending = dict(args[0])
+		pending.update(kwargs)
+
+		# Existing keys are overwritten in place, leaving only new keys to be
+		# placed in the table
+		existing_count = self._count
+
+		if existing_count:
+			new_keys = []
+			indexed = self._value_index is not None
+			for key, value in pending.items():
+				_, data_idx = self._lookup(key)
+				if data_idx is not None:
+					if indexed:
+						self._unindex_value(self._keys[data_idx],
+											self._values[data_idx])
+						self._index_value(key, value)
+					self._keys[data_idx] = key
+					self._values[data_idx] = value
+				else:
+					new_keys.append(key)
+		else:
+			new_keys = list(pending)
+
+		new_size = self._min_size_for(self._count + len(new_keys))
+
+		# Small updates fit in the current table, and inserting them one at a
+		# time is cheaper than relocating every existing entry
+		if new_size <= self._size:
+			for key in new_keys:
+				self.__setitem__(key, pending[key])
+			return
+
+		self._keys.extend(new_keys)
+		self._values.extend(map(pending.__getitem__, new_keys))
+		self._hashes.extend(map(hash, new_keys))
+
+		# New entries are placed in a single pass over the data while the
+		# table is rebuilt at its final size
+		self._count = len(self._keys)
+
+		try:
+			try:
+				self._rebuild(new_size)
+			except RuntimeError:
+				table = self._lay_out(self._hashes)
+
+				self._size = table._size
+				self._nbhd_size = table._nbhd_size
+				self._indices = table._indices
+				self._nbhds = table._nbhds
+				self._old_indices = None
+				self._old_nbhds = None
+				self._migration_idx = 0
+				self._resizes += 1
+		except BaseException:
+			del self._keys[existing_count:]
+			del self._values[existing_count:]
+			del self._hashes[existing_count:]
+			self._count = existing_count
+			raise
+
+		if self._value_index is not None:
+			for key in new_keys:
+				self._index_value(key, pending[key])
+
+	def __init__(self,
+				 *args: Any,
+				 expected_size: int=0,
+				 min_density: float=0.0,
+				 max_density: float=MAX_DENSITY,
+				 growth_factor: int=GROWTH_FACTOR,
+				 large_table_size: int=LARGE_TABLE_SIZE,
+				 incremental_resize: bool=False,
+				 index_values: bool=False,
+				 **kwargs: Any) -> None:
 		"""
 		Create a new instance with any specified values
-		"""
+
+		:param expected_size: The number of entries to reserve space for
+		:param min_density: The density below which deleting an entry shrinks
+							the dict, or 0 to never shrink automatically
+		:param max_density: The density at which inserting an entry grows
+							the dict
+		:param growth_factor: The factor to grow the dict by while it is
+							  smaller than large_table_size
+		:param large_table_size: The size from which the dict only doubles
+								 when growing
+		:param incremental_resize: Whether growing the dict should move entries
+								   to the larger lookup table a few at a time
+								   over subsequent operations instead of all
+								   at once
+		:param index_values: Whether to keep a reverse index of hashable
+							 values, making `value in d.values()` and
+							 `keys_for_value` constant-time at the cost of
+							 slower writes
+		"""
+		if not 0 < max_density <= 1:
+			raise ValueError("Maximum density must be between 0 and 1")
+
+		if growth_factor < 2 or growth_factor & growth_factor - 1:
+			raise ValueError("Growth factor must be a power of 2")
+
+		# A freshly-grown dict is never less dense than this, so anything
+		# higher could shrink the dict right after growing it
+		min_grown_density = max_density / max(growth_factor, 2)
+
+		if not 0 <= min_density < min_grown_density:
+			raise ValueError("Minimum density must be between 0 and {0}"
+							 .format(min_grown_density))
+
+		self._min_density = min_density
+		self._max_density = max_density
+		self._growth_factor = growth_factor
+		self._large_table_size = large_table_size
+		self._incremental = incremental_resize
+		self._value_index = None
+
+		# Counters reported by stats(); these cover the life of the instance
+		# and are not reset by clear()
+		self._free_up_calls = 0
+		self._free_up_failures = 0
+		self._resizes = 0
+
 		# Use clear function to do initial setup for new tables
 		if not hasattr(self, "_size"):
 			self.clear()
 
+		if expected_size:
+			self.reserve(expected_size)
+
+		if index_values:
+			self._index_values()
+
 		self.update(*args, **kwargs)
 
 	def __getitem__(self, key: Hashable) -> Any:
@@ -610,14 +1637,19 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		:param key: The key to set
 		:param value: The value to map the key to
 		"""
-		# The index key should map to in _lookup_table if it hasn't been evicted
-		expected_lookup_idx = abs(hash(key)) % self._size
+		key_hash = hash(key)
+
+		if self._old_indices is not None:
+			self._migrate(self.MIGRATION_BATCH_SIZE)
 
 		# The index of the key in _keys and its related value in _values
-		_, data_idx = self._lookup(key)
+		_, data_idx = self._lookup(key, key_hash)
 
 		# Overwrite an existing key with new data
 		if data_idx is not None:
+			if self._value_index is not None:
+				self._unindex_value(self._keys[data_idx], self._values[data_idx])
+				self._index_value(key, value)
 			self._keys[data_idx] = key
 			self._values[data_idx] = value
 			if not (len(self._keys) == len(self._values)):
@@ -628,35 +1660,53 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 						len(self._values)))
 			return
 
+		# The index key should map to in _lookup_table if it hasn't been evicted
+		size = self._size
+		expected_lookup_idx = abs(key_hash) % size
+
 		# If there is an empty neighbor of expected_lookup_idx,
 		# the entry for the new key/value can be stored there
-		nearest_nbr = self._get_open_neighbor(expected_lookup_idx)
-		if nearest_nbr is not None:
-			nbhd_idx = (nearest_nbr - expected_lookup_idx) % self._size
-			self._set_neighbor(expected_lookup_idx, nbhd_idx)
-			self._set_lookup_index_info(nearest_nbr, data=self._count)
-			self._keys.append(key)
-			self._values.append(value)
-			self._count += 1
+		indices = self._indices
+		nearest_nbr: Optional[int] = None
 
+		for nbhd_idx in range(self._nbhd_size):
+			lookup_idx = (expected_lookup_idx + nbhd_idx) % size
+			if indices[lookup_idx] == self.FREE_ENTRY:
+				nearest_nbr = lookup_idx
+				break
 		else:
 			# Free up a neighbor of the expected index to accomodate the new
 			# item
 			try:
 				self._free_up(expected_lookup_idx)
-
-			# No way to keep neighborhood invariant, must resize first
+				nearest_nbr = self._get_open_neighbor(expected_lookup_idx)
 			except RuntimeError:
-				if self._size < 2**16:
-					self._resize(self._size * 4)
-				else:
-					self._resize(self._size * 2)
+				pass
 
-			# There should now be an available neighbor of the expected index,
-			# try again
-			finally:
-				self.__setitem__(key, value)
-				return
+		self._keys.append(key)
+		self._values.append(value)
+		self._hashes.append(key_hash)
+		self._count += 1
+
+		if nearest_nbr is not None:
+			nbhd_idx = (nearest_nbr - expected_lookup_idx) % size
+			self._nbhds[expected_lookup_idx] |= 1 << nbhd_idx
+			indices[nearest_nbr] = self._count - 1
+
+		else:
+			# No way to keep neighborhood invariant, so the new item is placed
+			# along with every other while the dict is resized
+			try:
+				self._rebuild(self._next_size())
+			except BaseException:
+				del self._keys[-1]
+				del self._values[-1]
+				del self._hashes[-1]
+				self._count -= 1
+				raise
+
+		if self._value_index is not None:
+			self._index_value(key, value)
 
 		if len(self._keys) != len(self._values):
 			raise RuntimeError((
@@ -665,11 +1715,8 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 					len(self._keys),
 					len(self._values)))
 
-		if self._count / self._size >= self.MAX_DENSITY:
-			if self._size < 2**16:
-				self._resize(self._size * 4)
-			else:
-				self._resize(self._size * 2)
+		if self._count / self._size >= self._max_density:
+			self._grow()
 
 	def __delitem__(self, key: Hashable) -> None:
 		"""
@@ -677,47 +1724,13 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 
 		:param key: The key to remove from the dict 
 		"""
-		# The index key should map to in _lookup_table if it hasn't been evicted
-		expected_lookup_idx = abs(hash(key)) % self._size
-
-		# The index key actually maps to in _lookup_table,
-		# and the index its related value maps to in _values
-		lookup_idx, data_idx = self._lookup(key)
+		lookup_idx, data_idx = self._lookup_for_removal(key)
 
 		# Key not in dict
 		if data_idx is None:
 			raise KeyError(key)
 
-		else:
-			# If the key and its associated value aren't the last entries in
-			# their respective lists, swap with the last entries to not leave a
-			# hole in said lists
-			lookup_idx = cast(int, lookup_idx)
-
-			if data_idx != self._count - 1:
-				tail_key = self._keys[-1]
-				tail_val = self._values[-1]
-				tail_lookup_idx, tail_data_idx = self._lookup(tail_key)
-				tail_lookup_idx = cast(int, tail_lookup_idx)
-				# Move the data to be removed to the end of each list and update
-				# indices
-				self._keys[data_idx] = tail_key
-				self._values[data_idx] = tail_val
-				self._set_lookup_index_info(tail_lookup_idx, data=data_idx)
-
-			# Update the neighborhood of the index the key to be removed is
-			# supposed to point to, since the key to be removed must be
-			# somewhere in it
-			nbhd_idx = (lookup_idx - expected_lookup_idx) % self._size
-			self._clear_neighbor(expected_lookup_idx, nbhd_idx)
-
-			# Remove the last item from the variable tables, either the actual
-			# data to be removed or what was originally at the end before
-			# it was copied over the data to be removed
-			del self._keys[-1]
-			del self._values[-1]
-			self._set_lookup_index_info(lookup_idx, data=self.FREE_ENTRY)
-			self._count -= 1
+		self._remove(cast(int, lookup_idx), data_idx)
 
 	def __contains__(self, key: Hashable) -> bool:
 		"""
@@ -728,6 +1741,38 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		_, idx = self._lookup(key)
 		return idx is not None
 
+	def __copy__(self) -> "HopscotchDict":
+		return self.copy()
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> "HopscotchDict":
+		# Register the copy before copying the contents, which may refer
+		# back to this dict
+		out = self._clone([], [])
+		memo[id(self)] = out
+
+		out._keys = deepcopy(self._keys, memo)
+		out._values = deepcopy(self._values, memo)
+
+		# Slots declared by subclasses were only copied by reference
+		for attr in self._slot_names():
+			if attr not in HopscotchDict.__slots__ and hasattr(self, attr):
+				setattr(out, attr, deepcopy(getattr(self, attr), memo))
+
+		if out._value_index is not None:
+			out._index_values()
+
+		if hasattr(self, "__dict__"):
+			out.__dict__.update(deepcopy(self.__dict__, memo))
+
+		# Copied keys usually hash the same as the originals, so the lookup
+		# table can be reused; if any don't, it has to be rebuilt
+		hashes = array("q", map(hash, out._keys))
+		if hashes != self._hashes:
+			out._hashes = hashes
+			out._rebuild(out._size)
+
+		return out
+
 	def __eq__(self, other: Any) -> bool:
 		"""
 		Check if the given object is equivalent to this dict
@@ -737,17 +1782,51 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		:returns: True if the given object is equivalent to this dict,
 				  False otherwise
 		"""
-		if not isinstance(other, MutableMapping):
-			return False
+		if not isinstance(other, Mapping):
+			return NotImplemented
 
 		if len(self) != len(other):
 			return False
 
-		if set(self._keys) ^ set(other.keys()):
-			return False
-
-		return all(self[k] == other[k] and type(self[k]) == type(other[k])
-				   for k in self._keys)
+		if isinstance(other, HopscotchDict):
+			# Copies and dicts built the same way store their keys in the same
+			# order, so their values can be compared pairwise; list equality
+			# would treat identical values as equal without comparing them
+			if self._hashes == other._hashes and self._keys == other._keys:
+				for value, other_value in zip(self._values, other._values):
+					if not (value == other_value
+							and type(value) == type(other_value)):
+						return False
+
+				return True
+
+			# Otherwise each key is found in the other dict by its cached hash
+			for key, key_hash, value in zip(self._keys,
+											self._hashes,
+											self._values):
+				_, data_idx = other._lookup(key, key_hash)
+				if data_idx is None:
+					return False
+
+				other_value = other._values[data_idx]
+				if not (value == other_value
+						and type(value) == type(other_value)):
+					return False
+
+			return True
+
+		# Equal lengths mean there are no keys in the other mapping missing
+		# from this one if every key of this one is in it
+		missing = object()
+		for key, value in zip(self._keys, self._values):
+			other_value = other.get(key, missing)
+			if other_value is missing:
+				return False
+
+			if not (value == other_value and type(value) == type(other_value)):
+				return False
+
+		return True
 
 	def __iter__(self) -> Iterator[Hashable]:
 		"""
@@ -774,7 +1853,43 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		:returns: True if the given object is not equivalent to this dict,
 				  False otherwise
 		"""
-		return not self.__eq__(other)
+		result = self.__eq__(other)
+		return result if result is NotImplemented else not result
+
+	def __reduce_ex__(self, protocol: Any) -> Tuple[Any, ...]:
+		"""
+		Describe how to pickle the dict, storing its lookup table as raw
+		arrays so it doesn't need to be rebuilt when unpickled
+
+		:param protocol: The pickle protocol in use
+
+		:returns: A tuple creating an empty instance of the same type and the
+				  state to restore into it; with protocol 5 and above, the
+				  arrays in the state can be passed out-of-band
+		"""
+		tables = [self._hashes, self._indices, self._nbhds]
+		if self._old_indices is not None:
+			tables.extend((self._old_indices, cast(array, self._old_nbhds)))
+
+		table_data: List[Tuple[str, Any]]
+		if protocol >= 5 and version_info >= (3, 8):
+			table_data = [(t.typecode, PickleBuffer(t)) for t in tables]
+		else:
+			table_data = [(t.typecode, t.tobytes()) for t in tables]
+
+		# Slots declared by subclasses are kept along with these
+		state = {attr: getattr(self, attr) for attr in self._slot_names()
+				 if attr not in {"_hashes", "_indices", "_nbhds",
+								 "_old_indices", "_old_nbhds", "_value_index"}
+				 and hasattr(self, attr)}
+		state["tables"] = table_data
+		state["index_values"] = self._value_index is not None
+		state["table_format"] = (byteorder, _HASH_CHECK)
+
+		if hasattr(self, "__dict__"):
+			state["__dict__"] = self.__dict__
+
+		return (self.__class__.__new__, (self.__class__,), state)
 
 	def __repr__(self) -> str:
 		"""
@@ -794,6 +1909,57 @@ class HopscotchDict(MutableMapping[Hashable, Any]):
 		"""
 		return reversed(self._keys)
 
+	def __setstate__(self, state: Dict[str, Any]) -> None:
+		"""
+		Restore a pickled dict, reusing its lookup table when the keys hash
+		the same as they did when it was pickled and rebuilding it otherwise
+
+		:param state: The state created by __reduce_ex__
+		"""
+		state = dict(state)
+		table_data = state.pop("tables")
+		table_format = state.pop("table_format")
+		index_values = state.pop("index_values", False)
+		instance_dict = state.pop("__dict__", None)
+
+		if instance_dict:
+			self.__dict__.update(instance_dict)
+
+		for attr, val in state.items():
+			setattr(self, attr, val)
+
+		# The reverse index of values is cheaper to rebuild than to pickle
+		self._value_index = None
+		if index_values:
+			self._index_values()
+
+		self._old_indices = None
+		self._old_nbhds = None
+
+		# Keys whose hashes aren't derived from their contents, like those of
+		# plain objects, hash differently even when the hash seed is the same
+		hashes = array("q", map(hash, self._keys))
+
+		# Tables from a different platform or hash seed are of no use
+		if table_format == (byteorder, _HASH_CHECK):
+			tables = []
+			for typecode, data in table_data:
+				# Out-of-band buffers keep the format of the array they
+				# came from
+				table = array(typecode)
+				table.frombytes(memoryview(data).cast("B"))
+				tables.append(table)
+
+			if tables[0] == hashes:
+				self._hashes, self._indices, self._nbhds = tables[:3]
+				if len(tables) > 3:
+					self._old_indices, self._old_nbhds = tables[3:]
+				return
+
+		self._hashes = hashes
+		self._indices, self._nbhds = self._make_lookup_table(self._size)
+		self._rebuild(self._size)
+
 	def __str__(self) -> str:
 		"""
 		Return a simpler representation of the items in the dict
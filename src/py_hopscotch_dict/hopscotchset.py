@@ -0,0 +1,373 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+"""
+A set stored in a hopscotch lookup table, holding only keys
+
+The keys and their hashes are kept in a HopscotchDict that is only used for its
+lookup table, so the set has no list of values to pay for. Operators between
+two HopscotchSets reuse the hashes each set already stores, and lay out the
+table of the result once instead of inserting its keys one at a time.
+"""
+
+from array import array
+from typing import (AbstractSet,
+					Any,
+					Hashable,
+					Iterable,
+					Iterator,
+					List,
+					MutableSet,
+					Sequence,
+					Tuple
+					)
+
+from py_hopscotch_dict.hopscotchdict import HopscotchDict
+
+
+class HopscotchSet(MutableSet[Hashable]):
+	__slots__ = ("_table",)
+
+	_table: HopscotchDict
+
+	@classmethod
+	def _from_entries(cls,
+					  keys: List[Hashable],
+					  hashes: Iterable[int]) -> "HopscotchSet":
+		"""
+		Create a new instance holding the given distinct keys
+
+		:param keys: The keys to store, none of which are equal to each other
+		:param hashes: The hashes of the keys, in the same order as the keys
+
+		:returns: A new instance holding the keys
+		"""
+		out = cls()
+		out._fill(keys, hashes)
+		return out
+
+	@classmethod
+	def _from_iterable(cls, iterable: Iterable[Any]) -> AbstractSet[Any]:
+		return cls(iterable)
+
+	def add(self, key: Hashable) -> None:
+		"""
+		Add the given key to the set if it isn't already there
+
+		:param key: The key to add
+		"""
+		key_hash = hash(key)
+
+		if self._table._lookup(key, key_hash)[1] is None:
+			self._insert(key, key_hash)
+
+	def clear(self) -> None:
+		"""
+		Remove every key from the set and return it to its original size
+		"""
+		self._table.clear()
+
+	def copy(self) -> "HopscotchSet":
+		"""
+		Create a shallow copy of the set, reusing its lookup table
+
+		:returns: A new instance containing the same keys
+		"""
+		out = self.__class__()
+		out._table = self._table._clone(self._table._keys[:], [])
+		return out
+
+	def discard(self, key: Hashable) -> None:
+		"""
+		Remove the given key from the set if it is there
+
+		:param key: The key to remove
+		"""
+		table = self._table
+		_, data_idx = table._lookup(key)
+
+		if data_idx is None:
+			return
+
+		# Move the last key into the removed key's place, so the list of keys
+		# has no holes
+		tail_data_idx = table._count - 1
+		table._repoint(data_idx, table.FREE_ENTRY)
+
+		if data_idx != tail_data_idx:
+			table._repoint(tail_data_idx, data_idx)
+			table._keys[data_idx] = table._keys[tail_data_idx]
+			table._hashes[data_idx] = table._hashes[tail_data_idx]
+
+		del table._keys[-1]
+		del table._hashes[-1]
+		table._count -= 1
+
+	def pop(self) -> Hashable:
+		"""
+		Remove and return the most recently added key, erroring if the set is
+		empty
+
+		:returns: A key from the set
+		"""
+		if not self._table._count:
+			raise KeyError("pop from an empty set")
+
+		key = self._table._keys[-1]
+		self.discard(key)
+		return key
+
+	def update(self, *others: Iterable[Hashable]) -> None:
+		"""
+		Add every key in the given iterables to the set
+
+		:param others: The iterables of keys to add
+		"""
+		for other in others:
+			for key in other:
+				self.add(key)
+
+	def _derive(self,
+				kept: Sequence[int],
+				removed: Sequence[int],
+				other: "HopscotchSet",
+				added: Sequence[int]) -> "HopscotchSet":
+		"""
+		Create a new set holding some of the keys of this set and some of the
+		keys of another
+
+		:param kept: Indices into this set's keys of the keys to include
+		:param removed: Indices into this set's keys of the keys to leave out
+		:param other: The set to include keys from
+		:param added: Indices into the other set's keys of the keys to include,
+					  none of which are in this set
+
+		:returns: A new instance holding the chosen keys
+		"""
+		table = self._table
+		count = len(kept) + len(added)
+
+		# Editing a copy of this set's lookup table is cheaper than laying out
+		# a new one when only a few keys change
+		if (len(removed) + len(added) < count
+				and table._min_size_for(count) <= table._size):
+			out = self.copy()
+			for data_idx in removed:
+				out.discard(table._keys[data_idx])
+
+			for data_idx in added:
+				out._insert(other._table._keys[data_idx],
+							other._table._hashes[data_idx])
+
+			return out
+
+		keys, hashes = self._subset(kept)
+		added_keys, added_hashes = other._subset(added)
+		return self._from_entries(keys + added_keys, hashes + added_hashes)
+
+	def _fill(self, keys: List[Hashable], hashes: Iterable[int]) -> None:
+		"""
+		Replace the contents of the set with the given distinct keys, laying
+		out the lookup table in a single pass
+
+		:param keys: The keys to store, none of which are equal to each other
+		:param hashes: The hashes of the keys, in the same order as the keys
+		"""
+		table = self._table
+		table._keys = keys
+		table._hashes = array("q", hashes)
+		table._count = len(keys)
+
+		try:
+			table._rebuild(table._min_size_for(table._count))
+		except RuntimeError:
+			# Keys whose hashes cluster may need a far larger table than their
+			# count calls for, which growing a key at a time can reach
+			stored_hashes = table._hashes
+			table.clear()
+
+			for (key, key_hash) in zip(keys, stored_hashes):
+				self._insert(key, key_hash)
+
+	def _insert(self, key: Hashable, key_hash: int) -> None:
+		"""
+		Add the given key, which must not already be in the set
+
+		:param key: The key to add
+		:param key_hash: The hash of the key
+		"""
+		table = self._table
+		table._keys.append(key)
+		table._hashes.append(key_hash)
+		table._count += 1
+
+		try:
+			if not table._place(table._count - 1, key_hash):
+				table._rebuild(table._next_size())
+		except BaseException:
+			del table._keys[-1]
+			del table._hashes[-1]
+			table._count -= 1
+			raise
+
+		if table._count / table._size >= table._max_density:
+			table._grow()
+
+	def _partition(self,
+				   other: "HopscotchSet") -> Tuple[List[int], List[int]]:
+		"""
+		Split the keys of the given set into those in this set and those not,
+		using the hashes the other set already stores
+
+		:param other: The set whose keys to look up
+
+		:return: The indices into the other set's keys of those in this set,
+				 then of those not in this set
+		"""
+		table = self._table
+		size = table._size
+		indices = table._indices
+		nbhds = table._nbhds
+		stored_keys = table._keys
+		hashes = table._hashes
+		inside = []
+		outside = []
+
+		# Inlined from HopscotchDict._lookup, reusing the other set's stored
+		# hashes; sets never resize incrementally, so there is no old table to
+		# check
+		for (data_idx, (key, key_hash)) in enumerate(zip(other._table._keys,
+														 other._table._hashes)):
+			expected_lookup_idx = abs(key_hash) % size
+			nbhd = nbhds[expected_lookup_idx]
+			found = False
+
+			while nbhd:
+				lowest_bit = nbhd & -nbhd
+				nbhd ^= lowest_bit
+				nbr_idx = indices[(expected_lookup_idx
+								   + lowest_bit.bit_length() - 1) % size]
+
+				nbr_key = stored_keys[nbr_idx]
+				if nbr_key is key or (hashes[nbr_idx] == key_hash
+									  and nbr_key == key):
+					found = True
+					break
+
+			if found:
+				inside.append(data_idx)
+			else:
+				outside.append(data_idx)
+
+		return (inside, outside)
+
+	def _subset(self,
+				data_idxs: Sequence[int]) -> Tuple[List[Hashable], List[int]]:
+		"""
+		Collect the keys at the given indices and their hashes
+
+		:param data_idxs: Indices into the keys of this set
+
+		:return: The keys at the indices, then their hashes
+		"""
+		keys = self._table._keys
+		hashes = self._table._hashes
+		return ([keys[i] for i in data_idxs], [hashes[i] for i in data_idxs])
+
+	def __init__(self, iterable: Iterable[Hashable]=()) -> None:
+		"""
+		Create a new instance holding the keys in the given iterable
+
+		:param iterable: The keys to add
+		"""
+		self._table = HopscotchDict()
+
+		# Collapse duplicate keys up front, so the table only has to be laid
+		# out once
+		keys = list(dict.fromkeys(iterable))
+
+		if keys:
+			self._fill(keys, map(hash, keys))
+
+	def __and__(self, other: Any) -> Any:
+		if not isinstance(other, HopscotchSet):
+			return super(HopscotchSet, self).__and__(other)
+
+		# Look up the keys of the smaller set in the larger one
+		smaller, larger = sorted((self, other), key=len)
+		inside, outside = larger._partition(smaller)
+		return smaller._derive(inside, outside, larger, [])
+
+	def __contains__(self, key: Any) -> bool:
+		"""
+		Check if the given key is in the set
+
+		:returns: True if the key is in the set, False otherwise
+		"""
+		return self._table._lookup(key)[1] is not None
+
+	def __copy__(self) -> "HopscotchSet":
+		return self.copy()
+
+	def __iter__(self) -> Iterator[Hashable]:
+		"""
+		Return an iterator over the keys
+
+		:returns: An iterator over the keys
+		"""
+		return iter(self._table._keys)
+
+	def __len__(self) -> int:
+		"""
+		Return the number of keys stored
+
+		:returns: The number of keys stored
+		"""
+		return self._table._count
+
+	def __or__(self, other: Any) -> Any:
+		if not isinstance(other, HopscotchSet):
+			return super(HopscotchSet, self).__or__(other)
+
+		# Add the missing keys of the smaller set to the larger one
+		smaller, larger = sorted((self, other), key=len)
+		_, outside = larger._partition(smaller)
+		return larger._derive(range(len(larger)), [], smaller, outside)
+
+	def __reduce__(self) -> Tuple[Any, ...]:
+		return (self.__class__, (list(self._table._keys),))
+
+	def __repr__(self) -> str:
+		"""
+		Return a representation that could be used to create an equivalent set
+		using `eval()`
+
+		:returns: A string that could be used to create an equivalent
+				  representation
+		"""
+		return "{0}({1!r})".format(self.__class__.__name__, self._table._keys)
+
+	def __sub__(self, other: Any) -> Any:
+		if not isinstance(other, HopscotchSet):
+			return super(HopscotchSet, self).__sub__(other)
+
+		inside, outside = other._partition(self)
+		return self._derive(outside, inside, other, [])
+
+	def __xor__(self, other: Any) -> Any:
+		if not isinstance(other, HopscotchSet):
+			return super(HopscotchSet, self).__xor__(other)
+
+		self_inside, self_outside = other._partition(self)
+		_, other_outside = self._partition(other)
+		return self._derive(self_outside, self_inside, other, other_outside)
+
+	__rand__ = __and__
+	__ror__ = __or__
+	__rxor__ = __xor__
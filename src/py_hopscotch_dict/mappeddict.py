@@ -0,0 +1,291 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+"""
+A read-only HopscotchDict stored in a file, for fixed-width keys and values
+
+The file holds a header followed by the lookup table, the keys and the values,
+each as a native-endian array:
+
+- magic (8 bytes), format version (1 byte), byte order (1 byte, `<` or `>`)
+- the typecodes of the indices, neighborhoods, keys and values (4 bytes)
+- neighborhood size (2 bytes), table size (8 bytes), entry count (8 bytes)
+
+The header is little-endian with no padding; every array starts on an 8-byte
+boundary. Opening a file maps it into memory instead of reading it, so any
+number of processes can open the same file at once and share its pages.
+"""
+
+from array import array
+from mmap import ACCESS_READ, mmap
+from struct import Struct
+from sys import byteorder
+from typing import (Any,
+					BinaryIO,
+					Hashable,
+					Iterable,
+					Iterator,
+					List,
+					Mapping,
+					Optional,
+					Tuple,
+					Union
+					)
+
+from py_hopscotch_dict.hopscotchdict import HopscotchDict
+
+
+MAGIC = b"HOPSCOTC"
+
+FORMAT_VERSION = 1
+
+# Typecodes with the same width on every supported platform
+ALLOWED_FORMATS = frozenset("bBhHiIqQfd")
+
+_HEADER = Struct("<8sBc4sHQQ")
+
+_BYTE_ORDER = b"<" if byteorder == "little" else b">"
+
+
+def _padding(length: int) -> int:
+	"""
+	Find the number of bytes needed to pad the given length to a multiple of 8
+
+	:param length: The length to pad
+
+	:return: The number of padding bytes
+	"""
+	return -length % 8
+
+
+def _sections(formats: str,
+			  size: int,
+			  count: int) -> List[Tuple[Any, int, int]]:
+	"""
+	Find where each array described by a header is stored
+
+	:param formats: The typecodes of the indices, neighborhoods, keys and
+					values
+	:param size: The size of the lookup table
+	:param count: The number of entries
+
+	:return: The typecode, start and end of the indices, neighborhoods, keys
+			 and values, in that order
+	"""
+	sections = []
+	offset = _HEADER.size + _padding(_HEADER.size)
+
+	for fmt, length in zip(formats, (size, size, count, count)):
+		end = offset + length * array(fmt).itemsize
+		sections.append((fmt, offset, end))
+		offset = end + _padding(end)
+
+	return sections
+
+
+class MappedHopscotchDict(Mapping[Hashable, Any]):
+	__slots__ = ("_count", "_file", "_indices", "_keys", "_map", "_nbhd_size",
+				 "_nbhds", "_path", "_size", "_values")
+
+	@classmethod
+	def write(cls,
+			  path: str,
+			  data: Union[Mapping[Any, Any], Iterable[Tuple[Any, Any]]],
+			  key_format: str="q",
+			  value_format: str="q") -> "MappedHopscotchDict":
+		"""
+		Store the given items in a new file, overwriting any existing one
+
+		:param path: The path of the file to create
+		:param data: A mapping or iterable of `(key, value)` pairs; pairs are
+					 collected into a dict first to drop duplicate keys
+		:param key_format: The `array` typecode to store keys as
+		:param value_format: The `array` typecode to store values as
+
+		:returns: The new file, opened for reading
+		"""
+		for fmt in (key_format, value_format):
+			if fmt not in ALLOWED_FORMATS:
+				raise ValueError("Unsupported format {0!r}".format(fmt))
+
+		if not isinstance(data, Mapping):
+			data = dict(data)
+
+		keys = array(key_format, data.keys())
+		values = array(value_format, data.values())
+
+		# Only the hashes are needed to lay out the lookup table, so the keys
+		# never have to be held as Python objects; they are hashed as stored,
+		# since storing them may lose precision
+		nbhd_size, indices, nbhds = HopscotchDict._build_lookup_table(
+			array("q", map(hash, keys)))
+
+		header = _HEADER.pack(MAGIC,
+							  FORMAT_VERSION,
+							  _BYTE_ORDER,
+							  "".join((indices.typecode,
+									   nbhds.typecode,
+									   key_format,
+									   value_format)).encode("ascii"),
+							  nbhd_size,
+							  len(indices),
+							  len(keys))
+
+		with open(path, "wb") as out_file:
+			out_file.write(header)
+			for section in (indices, nbhds, keys, values):
+				section.tofile(out_file)
+				out_file.write(bytes(_padding(len(section) * section.itemsize)))
+
+		return cls(path)
+
+	def close(self) -> None:
+		"""
+		Unmap the file; the dict cannot be used afterwards
+		"""
+		# The map can't be closed while any views of it exist
+		for view in (self._indices, self._nbhds, self._keys, self._values):
+			view.release()
+
+		self._map.close()
+		self._file.close()
+
+	def _lookup(self, key: Hashable) -> Optional[int]:
+		"""
+		Find the index of the given key in the keys array
+
+		:param key: The key to search for
+
+		:return: The index of the key, or None if it is not in the dict
+		"""
+		size = self._size
+		expected_lookup_idx = abs(hash(key)) % size
+		nbhd = self._nbhds[expected_lookup_idx]
+
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			lookup_idx = (expected_lookup_idx + lowest_bit.bit_length() - 1) % size
+			data_idx = self._indices[lookup_idx]
+
+			if self._keys[data_idx] == key:
+				return data_idx
+
+		return None
+
+	def __init__(self, path: str) -> None:
+		"""
+		Open a file created by `write` for reading
+
+		:param path: The path of the file to open
+		"""
+		self._path = path
+		self._file: BinaryIO = open(path, "rb")
+
+		try:
+			header = self._file.read(_HEADER.size)
+			if len(header) < _HEADER.size or header[:len(MAGIC)] != MAGIC:
+				raise ValueError("{0} is not a MappedHopscotchDict file"
+								 .format(path))
+
+			(_, version, order, formats,
+			 self._nbhd_size, self._size, self._count) = _HEADER.unpack(header)
+
+			if version != FORMAT_VERSION:
+				raise ValueError("Unsupported file format version {0}"
+								 .format(version))
+
+			if order != _BYTE_ORDER:
+				raise ValueError("File was written with a different byte order")
+
+			typecodes = formats.decode("latin-1")
+			index_fmt, nbhd_fmt, key_fmt, value_fmt = typecodes
+			if (index_fmt not in "bhiq" or nbhd_fmt not in "BHIQ"
+					or key_fmt not in ALLOWED_FORMATS
+					or value_fmt not in ALLOWED_FORMATS):
+				raise ValueError("{0} has unsupported formats {1!r}"
+								 .format(path, typecodes))
+
+			sections = _sections(typecodes, self._size, self._count)
+
+			self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+
+			# A truncated file would otherwise only fail once a lookup reached
+			# past its end
+			if len(self._map) < sections[-1][2]:
+				self._map.close()
+				raise ValueError("{0} is truncated".format(path))
+		except BaseException:
+			self._file.close()
+			raise
+
+		view = memoryview(self._map)
+		(self._indices,
+		 self._nbhds,
+		 self._keys,
+		 self._values) = [view[start:end].cast(fmt)
+						  for fmt, start, end in sections]
+		view.release()
+
+	def __getitem__(self, key: Hashable) -> Any:
+		"""
+		Retrieve the value associated with the given key,
+		erroring if the key does not exist
+
+		:param key: The key to search for
+
+		:returns: The value associated with the given key
+		"""
+		idx = self._lookup(key)
+		if idx is None:
+			raise KeyError(key)
+
+		return self._values[idx]
+
+	def __contains__(self, key: Any) -> bool:
+		"""
+		Check if the given key exists
+
+		:returns: True if the key exists, False otherwise
+		"""
+		return self._lookup(key) is not None
+
+	def __enter__(self) -> "MappedHopscotchDict":
+		return self
+
+	def __exit__(self, *exc_info: Any) -> None:
+		self.close()
+
+	def __iter__(self) -> Iterator[Hashable]:
+		"""
+		Return an iterator over the keys
+
+		:returns: An iterator over the keys
+		"""
+		return iter(self._keys)
+
+	def __len__(self) -> int:
+		"""
+		Return the number of items stored
+
+		:returns: The number of items stored
+		"""
+		return self._count
+
+	def __reduce__(self) -> Tuple[Any, ...]:
+		"""
+		Pickle the dict as the path to its file, so passing it to another
+		process maps the same file there
+
+		:returns: A tuple reopening the file
+		"""
+		return (self.__class__, (self._path,))
+
+	def __repr__(self) -> str:
+		return "{0}({1!r})".format(self.__class__.__name__, self._path)
@@ -0,0 +1,285 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+"""
+A HopscotchDict for int64 keys, looked up and inserted in whole NumPy arrays
+
+Each key is its own hash, so the index a key maps to is `key & (size - 1)`
+and a lookup of many keys is a handful of vectorized operations per
+neighborhood bit instead of a Python loop per key. Entries are still placed in
+the lookup table by HopscotchDict's own code.
+
+Requires NumPy, which can be installed with the `numpy` extra.
+"""
+
+from typing import Any, Hashable, Iterator, Mapping, Optional
+
+import numpy as np
+
+from numpy.typing import ArrayLike, DTypeLike
+
+from py_hopscotch_dict.hopscotchdict import HopscotchDict
+
+
+# Clearing the sign bit of a key keeps its low bits, so HopscotchDict places
+# it at `abs(hash) % size`, which is the same index as `key & (size - 1)`
+_SIGN_MASK = np.int64(2 ** 63 - 1)
+
+
+class IntHopscotchDict(Mapping[Hashable, Any]):
+	__slots__ = ("_count", "_keys", "_table", "_values")
+
+	_count: int
+	_keys: np.ndarray
+	_table: HopscotchDict
+	_values: np.ndarray
+
+	def contains(self, keys: ArrayLike) -> np.ndarray:
+		"""
+		Check whether each of the given keys exists
+
+		:param keys: An array of int64 keys
+
+		:returns: A boolean array of the same shape as keys
+		"""
+		keys = np.asarray(keys, dtype=np.int64)
+		return (self._find(keys.ravel()) >= 0).reshape(keys.shape)
+
+	def insert(self, keys: ArrayLike, values: ArrayLike) -> None:
+		"""
+		Map each of the given keys to the value at the same position,
+		overwriting any previously-stored values; the last value given for a
+		repeated key wins
+
+		:param keys: An array of int64 keys
+		:param values: An array of values of the same shape as keys
+		"""
+		keys = np.asarray(keys, dtype=np.int64).ravel()
+		values = np.asarray(values, dtype=self._values.dtype).ravel()
+
+		if keys.shape != values.shape:
+			raise ValueError("Got {0} keys but {1} values"
+							 .format(keys.size, values.size))
+
+		# Keep the last occurrence of each key, in the order given
+		_, reversed_idx = np.unique(keys[::-1], return_index=True)
+		last_idx = np.sort(keys.size - 1 - reversed_idx)
+		keys = keys[last_idx]
+		values = values[last_idx]
+
+		found_idx = self._find(keys)
+		existing = found_idx >= 0
+		new_keys = keys[~existing]
+
+		if new_keys.size:
+			self._append(new_keys, values[~existing])
+
+		# Existing values are only overwritten once every new key is in, so
+		# failing to add one leaves the dict as it was
+		self._values[found_idx[existing]] = values[existing]
+
+	def lookup(self, keys: ArrayLike, default: Any=None) -> np.ndarray:
+		"""
+		Retrieve the values corresponding to each of the given keys, erroring
+		if any key does not exist and no default value was given
+
+		:param keys: An array of int64 keys
+		:param default: The value to use for keys that do not exist
+
+		:returns: An array of values of the same shape as keys
+		"""
+		keys = np.asarray(keys, dtype=np.int64)
+		data_idx = self._find(keys.ravel())
+		found = data_idx >= 0
+
+		if found.all():
+			return self._values[data_idx].reshape(keys.shape)
+
+		if default is None:
+			raise KeyError(int(keys.ravel()[~found][0]))
+
+		out = np.full(data_idx.shape, default, dtype=self._values.dtype)
+		out[found] = self._values[data_idx[found]]
+		return out.reshape(keys.shape)
+
+	def _append(self, keys: np.ndarray, values: np.ndarray) -> None:
+		"""
+		Add the given keys, none of which have been inserted, with their values
+
+		:param keys: A one-dimensional array of int64 keys
+		:param values: An array of values of the same shape as keys
+		"""
+		start = self._count
+		end = start + keys.size
+		self._reserve_storage(end)
+		self._keys[start:end] = keys
+		self._values[start:end] = values
+
+		table = self._table
+		table._hashes.frombytes((keys & _SIGN_MASK).tobytes())
+		table._count = end
+		self._count = end
+
+		try:
+			new_size = table._min_size_for(end)
+
+			if new_size > table._size:
+				table._rebuild(new_size)
+				return
+
+			hashes = table._hashes
+			for data_idx in range(start, end):
+				# Resizing places every entry, including the rest of these
+				if not table._place(data_idx, hashes[data_idx]):
+					table._rebuild(table._next_size())
+					break
+
+		except BaseException:
+			del table._hashes[start:]
+			table._count = start
+			self._count = start
+
+			# Some of the new entries may have been placed before failing
+			table._rebuild(table._size)
+			raise
+
+	def _find(self, keys: np.ndarray) -> np.ndarray:
+		"""
+		Find the indices of the given keys in _keys/_values
+
+		:param keys: A one-dimensional array of int64 keys
+
+		:return: An array holding the index of each key, or -1 for keys that
+				 have not been inserted
+		"""
+		table = self._table
+		mask = table._size - 1
+
+		# Views of the table have to be made each time, since resizing
+		# replaces it
+		indices = np.frombuffer(table._indices, dtype=table._indices.typecode)
+		nbhds = np.frombuffer(table._nbhds, dtype=table._nbhds.typecode)
+
+		expected_lookup_idx = keys & mask
+		nbhd = nbhds[expected_lookup_idx].astype(np.uint64)
+		out = np.full(keys.shape, -1, dtype=np.int64)
+
+		# Check every key's nth neighbor at once, for each n that some key
+		# has an occupied nth neighbor
+		for nbhd_idx in range(table._nbhd_size):
+			occupied = np.flatnonzero(nbhd & np.uint64(1 << nbhd_idx))
+			if not occupied.size:
+				if not (nbhd >> np.uint64(nbhd_idx)).any():
+					break
+				continue
+
+			data_idx = indices[(expected_lookup_idx[occupied] + nbhd_idx) & mask]
+			matched = self._keys[data_idx] == keys[occupied]
+			out[occupied[matched]] = data_idx[matched]
+
+		return out
+
+	def _find_key(self, key: Any) -> int:
+		"""
+		Find the index of a single key in _keys/_values
+
+		:param key: The key to search for
+
+		:return: The index of the key, or -1 if it has not been inserted
+		"""
+		# Anything that can't be stored as an int64 can't have been inserted
+		if not isinstance(key, (int, np.integer)):
+			return -1
+
+		try:
+			query = np.array([key], dtype=np.int64)
+		except OverflowError:
+			return -1
+
+		return int(self._find(query)[0])
+
+	def _reserve_storage(self, count: int) -> None:
+		"""
+		Grow _keys/_values so they can hold the given number of entries
+
+		:param count: The number of entries to make room for
+		"""
+		capacity = self._keys.size
+
+		if count <= capacity:
+			return
+
+		capacity = max(count, capacity * 2)
+
+		for attr in ("_keys", "_values"):
+			old = getattr(self, attr)
+			new = np.empty(capacity, dtype=old.dtype)
+			new[:self._count] = old[:self._count]
+			setattr(self, attr, new)
+
+	def __init__(self,
+				 keys: Optional[ArrayLike]=None,
+				 values: Optional[ArrayLike]=None,
+				 value_dtype: DTypeLike=np.int64) -> None:
+		"""
+		Create a new instance, inserting the given keys and values if any
+
+		:param keys: An array of int64 keys
+		:param values: An array of values of the same shape as keys
+		:param value_dtype: The NumPy dtype to store values as
+		"""
+		self._count = 0
+		self._keys = np.empty(8, dtype=np.int64)
+		self._values = np.empty(8, dtype=value_dtype)
+
+		# Only holds the layout of the lookup table, for HopscotchDict's
+		# placement and resizing code to maintain
+		self._table = HopscotchDict()
+
+		if keys is not None:
+			self.insert(keys, values if values is not None else [])
+
+	def __getitem__(self, key: Hashable) -> Any:
+		"""
+		Retrieve the value associated with the given key,
+		erroring if the key does not exist
+
+		:param key: The key to search for
+
+		:returns: The value associated with the given key
+		"""
+		data_idx = self._find_key(key)
+		if data_idx < 0:
+			raise KeyError(key)
+
+		return self._values[data_idx]
+
+	def __contains__(self, key: Any) -> bool:
+		"""
+		Check if the given key exists
+
+		:returns: True if the key exists, False otherwise
+		"""
+		return self._find_key(key) >= 0
+
+	def __iter__(self) -> Iterator[Hashable]:
+		"""
+		Return an iterator over the keys
+
+		:returns: An iterator over the keys
+		"""
+		return iter(self._keys[:self._count].tolist())
+
+	def __len__(self) -> int:
+		"""
+		Return the number of items stored
+
+		:returns: The number of items stored
+		"""
+		return self._count
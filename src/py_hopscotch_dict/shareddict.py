@@ -0,0 +1,423 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+"""
+A read-only snapshot of a mapping in shared memory, for use by many processes
+
+Keys and values may be None, bools, ints, floats, strs or bytes. The shared
+memory block holds a header followed by these native-endian arrays, each
+starting on an 8-byte boundary:
+
+- the hashes of the keys, and the indices and neighborhoods of the lookup table
+- the offsets of each encoded key and value, plus the end of the last one
+- the encoded keys, then the encoded values
+
+Processes whose strings or None hash differently from the one that made the
+snapshot can still attach to it, but have to build a private copy of the lookup
+table.
+"""
+
+from array import array
+from itertools import accumulate
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+import os
+import sys
+
+from sys import byteorder
+from typing import (Any,
+					Callable,
+					cast,
+					Dict,
+					Hashable,
+					Iterator,
+					List,
+					Mapping,
+					Optional,
+					Set,
+					Tuple
+					)
+
+from py_hopscotch_dict.hopscotchdict import _HASH_CHECK, HopscotchDict
+
+
+MAGIC = b"HOPSHARE"
+
+FORMAT_VERSION = 1
+
+_HEADER = Struct("<8sBcq2sHQQQQ")
+
+_BYTE_ORDER = b"<" if byteorder == "little" else b">"
+
+_FLOAT = Struct("<d")
+
+# Names of the blocks created by this process, whose resource tracker is meant
+# to free them; forked children share both this and the tracker
+_CREATED: Set[str] = set()
+
+_ENCODERS: Dict[type, Callable[[Any], bytes]] = {
+	type(None): lambda obj: b"n",
+	bool: lambda obj: b"t" if obj else b"f",
+	int: lambda obj: b"i" + obj.to_bytes((obj.bit_length() + 8) // 8,
+										 "little",
+										 signed=True),
+	float: lambda obj: b"d" + _FLOAT.pack(obj),
+	str: lambda obj: b"s" + obj.encode("utf-8", "surrogatepass"),
+	bytes: lambda obj: b"b" + obj,
+	}
+
+_DECODERS: Dict[int, Callable[[memoryview], Any]] = {
+	ord("n"): lambda data: None,
+	ord("t"): lambda data: True,
+	ord("f"): lambda data: False,
+	ord("i"): lambda data: int.from_bytes(data, "little", signed=True),
+	ord("d"): lambda data: _FLOAT.unpack(data)[0],
+	ord("s"): lambda data: str(data, "utf-8", "surrogatepass"),
+	ord("b"): bytes,
+	}
+
+
+def _encode(obj: Any) -> bytes:
+	"""
+	Encode the given object for storage in shared memory
+
+	:param obj: The object to encode
+
+	:return: A tag identifying the type of the object followed by its data
+	"""
+	try:
+		encoder = _ENCODERS[type(obj)]
+	except KeyError:
+		raise TypeError("Cannot share objects of type {0}"
+						.format(type(obj).__name__)) from None
+
+	return encoder(obj)
+
+
+def _padding(length: int) -> int:
+	"""
+	Find the number of bytes needed to pad the given length to a multiple of 8
+
+	:param length: The length to pad
+
+	:return: The number of padding bytes
+	"""
+	return -length % 8
+
+
+def _sections(header: Tuple[Any, ...]) -> List[Tuple[Any, int, int]]:
+	"""
+	Find where each array described by the given header is stored
+
+	:param header: The unpacked header of a snapshot
+
+	:return: The typecode, start and end of the hashes, indices, neighborhoods,
+			 key offsets, value offsets, keys and values, in that order
+	"""
+	(_, _, _, _, formats, _,
+	 size, count, key_data_len, value_data_len) = header
+	index_fmt, nbhd_fmt = formats.decode("ascii")
+
+	sections = []
+	offset = _HEADER.size + _padding(_HEADER.size)
+
+	for fmt, length in (("q", count),
+						(index_fmt, size),
+						(nbhd_fmt, size),
+						("Q", count + 1),
+						("Q", count + 1),
+						("B", key_data_len),
+						("B", value_data_len)):
+		end = offset + length * array(fmt).itemsize
+		sections.append((fmt, offset, end))
+		offset = end + _padding(end)
+
+	return sections
+
+
+class SharedHopscotchDict(Mapping[Hashable, Any]):
+	__slots__ = ("_count", "_hashes", "_indices", "_key_data", "_key_offsets",
+				 "_nbhd_size", "_nbhds", "_shm", "_size", "_value_data",
+				 "_value_offsets", "_views")
+
+	@classmethod
+	def freeze(cls,
+			   source: Mapping[Any, Any],
+			   name: Optional[str]=None) -> "SharedHopscotchDict":
+		"""
+		Copy the given mapping into a new block of shared memory
+
+		The process that freezes a mapping owns the block, and must call
+		`unlink` once no process needs it anymore
+
+		:param source: The mapping to copy
+		:param name: The name of the block to create, or None to generate one
+
+		:returns: A snapshot of the mapping, attached to the new block
+		"""
+		if isinstance(source, HopscotchDict):
+			keys: List[Any] = source._keys
+			values: List[Any] = source._values
+			hashes = source._hashes
+		else:
+			keys = list(source)
+			values = [source[key] for key in keys]
+			hashes = array("q", map(hash, keys))
+
+		encoded_keys = list(map(_encode, keys))
+		encoded_values = list(map(_encode, values))
+		key_data = b"".join(encoded_keys)
+		value_data = b"".join(encoded_values)
+		key_offsets = array("Q", accumulate(map(len, encoded_keys), initial=0))
+		value_offsets = array("Q", accumulate(map(len, encoded_values),
+											  initial=0))
+
+		nbhd_size, indices, nbhds = HopscotchDict._build_lookup_table(hashes)
+
+		header = (MAGIC,
+				  FORMAT_VERSION,
+				  _BYTE_ORDER,
+				  _HASH_CHECK,
+				  (indices.typecode + nbhds.typecode).encode("ascii"),
+				  nbhd_size,
+				  len(indices),
+				  len(keys),
+				  len(key_data),
+				  len(value_data))
+		sections = _sections(header)
+
+		contents: List[Any] = [hashes,
+							   indices,
+							   nbhds,
+							   key_offsets,
+							   value_offsets,
+							   key_data,
+							   value_data]
+
+		shm = SharedMemory(name, create=True, size=sections[-1][2])
+		buf = cast(memoryview, shm.buf)
+		try:
+			_HEADER.pack_into(buf, 0, *header)
+			for data, (_, start, end) in zip(contents, sections):
+				buf[start:end] = memoryview(data).cast("B")
+		except BaseException:
+			shm.close()
+			shm.unlink()
+			raise
+
+		_CREATED.add(shm.name)
+
+		out = cls.__new__(cls)
+		out._attach(shm)
+		return out
+
+	def close(self) -> None:
+		"""
+		Detach from the shared memory; the dict cannot be used afterwards
+		"""
+		# The block can't be closed while any views of it exist
+		for view in self._views:
+			view.release()
+
+		self._shm.close()
+
+	def unlink(self) -> None:
+		"""
+		Free the shared memory once every process has detached from it
+		"""
+		self._shm.unlink()
+		_CREATED.discard(self._shm.name)
+
+	def _attach(self, shm: SharedMemory) -> None:
+		"""
+		Read the snapshot stored in the given block of shared memory
+
+		:param shm: The block of shared memory to read from
+		"""
+		self._shm = shm
+		buf = cast(memoryview, shm.buf).toreadonly()
+
+		try:
+			if len(buf) < _HEADER.size or buf[:len(MAGIC)] != MAGIC:
+				raise ValueError("{0} is not a SharedHopscotchDict"
+								 .format(shm.name))
+
+			header = _HEADER.unpack_from(buf)
+			(_, version, order, hash_check, _,
+			 self._nbhd_size, self._size, self._count, _, _) = header
+
+			if version != FORMAT_VERSION:
+				raise ValueError("Unsupported format version {0}"
+								 .format(version))
+
+			if order != _BYTE_ORDER:
+				raise ValueError("Snapshot has a different byte order")
+		except BaseException:
+			buf.release()
+			shm.close()
+			raise
+
+		self._views = [buf[start:end].cast(fmt)
+					   for fmt, start, end in _sections(header)]
+		buf.release()
+
+		(self._hashes,
+		 self._indices,
+		 self._nbhds,
+		 self._key_offsets,
+		 self._value_offsets,
+		 self._key_data,
+		 self._value_data) = self._views
+
+		# The stored hashes and lookup table only hold for processes whose
+		# strings and None hash the same as the one that made the snapshot
+		if hash_check != _HASH_CHECK:
+			hashes = array("q", map(hash, self))
+			self._nbhd_size, indices, nbhds = (
+				HopscotchDict._build_lookup_table(hashes))
+			self._hashes = memoryview(hashes)
+			self._indices = memoryview(indices)
+			self._nbhds = memoryview(nbhds)
+			self._size = len(indices)
+
+	def _key_at(self, data_idx: int) -> Any:
+		"""
+		Decode the key at the given index
+
+		:param data_idx: The index of the key
+
+		:return: The key at that index
+		"""
+		start = self._key_offsets[data_idx]
+		end = self._key_offsets[data_idx + 1]
+		return _DECODERS[self._key_data[start]](self._key_data[start + 1:end])
+
+	def _lookup(self, key: Hashable) -> Optional[int]:
+		"""
+		Find the index of the given key in the stored keys
+
+		:param key: The key to search for
+
+		:return: The index of the key, or None if it is not in the dict
+		"""
+		key_hash = hash(key)
+		size = self._size
+		expected_lookup_idx = abs(key_hash) % size
+		nbhd = self._nbhds[expected_lookup_idx]
+
+		while nbhd:
+			lowest_bit = nbhd & -nbhd
+			nbhd ^= lowest_bit
+			lookup_idx = (expected_lookup_idx + lowest_bit.bit_length() - 1) % size
+			data_idx = self._indices[lookup_idx]
+
+			if (self._hashes[data_idx] == key_hash
+					and self._key_at(data_idx) == key):
+				return data_idx
+
+		return None
+
+	def _value_at(self, data_idx: int) -> Any:
+		"""
+		Decode the value at the given index
+
+		:param data_idx: The index of the value
+
+		:return: The value at that index
+		"""
+		start = self._value_offsets[data_idx]
+		end = self._value_offsets[data_idx + 1]
+		return _DECODERS[self._value_data[start]](self._value_data[start + 1:end])
+
+	def __init__(self, name: str) -> None:
+		"""
+		Attach to a snapshot made by `freeze`, possibly in another process
+
+		:param name: The name of the shared memory holding the snapshot
+		"""
+		# Attaching must not make this process responsible for freeing the
+		# block, or its resource tracker would free it when the process exits
+		if sys.version_info >= (3, 13):
+			shm = SharedMemory(name, track=False)
+		else:
+			shm = SharedMemory(name)
+
+			# Older versions of Python always track the block, under its
+			# private name, so it has to be untracked again unless this
+			# process created it
+			if os.name == "posix" and shm.name not in _CREATED:
+				resource_tracker.unregister(getattr(shm, "_name"),
+											"shared_memory")
+
+		self._attach(shm)
+
+	def __getitem__(self, key: Hashable) -> Any:
+		"""
+		Retrieve the value associated with the given key,
+		erroring if the key does not exist
+
+		:param key: The key to search for
+
+		:returns: The value associated with the given key
+		"""
+		idx = self._lookup(key)
+		if idx is None:
+			raise KeyError(key)
+
+		return self._value_at(idx)
+
+	def __contains__(self, key: Any) -> bool:
+		"""
+		Check if the given key exists
+
+		:returns: True if the key exists, False otherwise
+		"""
+		return self._lookup(key) is not None
+
+	def __del__(self) -> None:
+		# The block closes itself once it is garbage collected, which fails
+		# while any views of it exist, so a dict that was never closed has to
+		# release them first
+		for view in getattr(self, "_views", ()):
+			view.release()
+
+	def __enter__(self) -> "SharedHopscotchDict":
+		return self
+
+	def __exit__(self, *exc_info: Any) -> None:
+		self.close()
+
+	def __iter__(self) -> Iterator[Hashable]:
+		"""
+		Return an iterator over the keys
+
+		:returns: An iterator over the keys
+		"""
+		return map(self._key_at, range(self._count))
+
+	def __len__(self) -> int:
+		"""
+		Return the number of items stored
+
+		:returns: The number of items stored
+		"""
+		return self._count
+
+	def __reduce__(self) -> Tuple[Any, ...]:
+		"""
+		Pickle the dict as the name of its shared memory, so passing it to
+		another process attaches to the same block there
+
+		:returns: A tuple attaching to the shared memory
+		"""
+		return (self.__class__, (self._shm.name,))
+
+	def __repr__(self) -> str:
+		return "{0}({1!r})".format(self.__class__.__name__, self._shm.name)
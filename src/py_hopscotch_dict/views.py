@@ -12,9 +12,13 @@ from typing import (Any,
 					Collection,
 					Hashable,
 					ItemsView,
+					Iterable,
 					Iterator,
 					KeysView,
+					List,
 					MappingView,
+					Sequence,
+					Set,
 					Tuple,
 					TYPE_CHECKING,
 					Union,
@@ -69,111 +73,159 @@ class HDView(MappingView):
 				result = True if self._source._values[idx] == v else False
 
 		elif isinstance(self, HDValues):
-			result = True if query in self._source._values else False
+			result = self._source._has_value(query)
 
 		return result
 
 	def __le__(self, other: AbstractSet[Any]) -> bool:
-		result = False
+		return self.issubset(other)
 
-		if self._source._count <= len(other) and isinstance(self, HDKeys):
-			result = all(k in other for k in self._source._keys)
+	def __ge__(self, other: AbstractSet[Any]) -> bool:
+		return self.issuperset(other)
 
-		elif self._source._count <= len(other) and isinstance(self, HDItems):
-			result = all(i in other for i in zip(self._source._keys, self._source._values))
+	def __and__(self, other: Iterable[Any]) -> Set[Any]:
+		return self.intersection(other)
 
-		return result
+	def __rand__(self, other: Iterable[Any]) -> Set[Any]:
+		return self.intersection(other)
 
-	def __ge__(self, other: AbstractSet[Any]) -> bool:
-		result = False
+	def __sub__(self, other: Iterable[Any]) -> Set[Any]:
+		return self.difference(other)
 
-		if self._source._count >= len(other) and isinstance(self, HDKeys):
-			result = all(k in self._source._keys for k in other)
+	def __xor__(self, other: Iterable[Any]) -> Set[Any]:
+		return self.symmetric_difference(other)
 
-		elif self._source._count >= len(other) and isinstance(self, HDItems):
-			items = set(zip(self._source._keys, self._source._values))
-			result = all(i in items for i in other)
+	def __rxor__(self, other: Iterable[Any]) -> Set[Any]:
+		return self.symmetric_difference(other)
 
-		return result
+	def _has_each(self, elems: List[Any]) -> Sequence[bool]:
+		"""
+		Check whether each of the given elements is in the view, looking them
+		all up in a single pass over the dict
 
-	def issubset(self, other: Collection[Any]) -> bool:
-		result = False
+		:param elems: The elements to search for
 
-		if self._source._count <= len(other) and isinstance(self, HDKeys):
-			result = all(k in other for k in self._source._keys)
+		:return: A sequence whose nth element is True if the nth element is in
+				 the view and False if it is not
+		"""
+		result: Sequence[bool] = []
 
-		elif self._source._count <= len(other) and isinstance(self, HDItems):
-			result = all(i in other for i in zip(self._source._keys, self._source._values))
+		if isinstance(self, HDKeys):
+			result = self._source.contains_many(elems)
 
-		return result
+		elif isinstance(self, HDItems):
+			missing = object()
+			pairs = [elem if isinstance(elem, tuple) and len(elem) == 2
+					 else (missing, missing)
+					 for elem in elems]
+			values = self._source.get_many([k for (k, _) in pairs], missing)
+			result = [value is not missing and value == v
+					  for (value, (_, v)) in zip(values, pairs)]
 
-	def issuperset(self, other: Collection[Any]) -> bool:
-		result = False
+		elif isinstance(self, HDValues):
+			result = [self._source._has_value(elem) for elem in elems]
 
-		if self._source._count >= len(other) and isinstance(self, HDKeys):
-			result = all(k in self._source._keys for k in other)
+		return result
 
-		elif self._source._count >= len(other) and isinstance(self, HDItems):
-			items = set(zip(self._source._keys, self._source._values))
-			result = all(i in items for i in other)
+	def _split(self,
+			   elems: List[Any],
+			   other: Collection[Any]) -> Tuple[List[Any], List[Any]]:
+		"""
+		Separate the given elements of this view into those that are in the
+		given collection and those that are not
 
-		return result
+		:param elems: Elements of this view
+		:param other: The collection to search for the elements in
 
-	def union(self, *others: Collection[Any]) -> AbstractSet[Any]:
-		result = set()
+		:return: The elements in the collection, then those not in it
+		"""
+		if isinstance(other, HDView):
+			found = other._has_each(elems)
+		else:
+			found = [elem in other for elem in elems]
 
-		if isinstance(self, HDKeys):
-			result.update(self._source._keys)
+		inside = [elem for (elem, is_in) in zip(elems, found) if is_in]
+		outside = [elem for (elem, is_in) in zip(elems, found) if not is_in]
+		return (inside, outside)
 
-		elif isinstance(self, HDItems):
-			result.update(zip(self._source._keys, self._source._values))
+	def issubset(self, other: Iterable[Any]) -> bool:
+		if not isinstance(other, AbstractSet):
+			other = set(other)
 
-		for other_set in others:
-			result.update(other_set)
+		if self._source._count > len(other):
+			return False
 
-		return result
+		_, outside = self._split(list(self), other)
+		return not outside
 
-	def intersection(self, *others: Collection[Any]) -> AbstractSet[Any]:
-		result = set()
+	def issuperset(self, other: Iterable[Any]) -> bool:
+		if isinstance(other, AbstractSet) and len(other) > self._source._count:
+			return False
 
-		if isinstance(self, HDKeys):
-			result.update(self._source._keys)
+		return all(self._has_each(list(other)))
 
-		elif isinstance(self, HDItems):
-			result.update(zip(self._source._keys, self._source._values))
+	def union(self, *others: Iterable[Any]) -> Set[Any]:
+		result = set(self)
 
 		for other_set in others:
-			result = result.intersection(other_set)
+			result.update(other_set)
 
 		return result
 
-	def difference(self, *others: Collection[Any]) -> AbstractSet[Any]:
-		result = set()
+	def intersection(self, *others: Iterable[Any]) -> Set[Any]:
+		if not others:
+			return set(self)
 
-		if isinstance(self, HDKeys):
-			result.update(self._source._keys)
+		# Iterate over whichever of this view and the first operand is smaller,
+		# looking its elements up in the other
+		first = others[0]
+		if isinstance(first, AbstractSet) and len(first) > self._source._count:
+			result, _ = self._split(list(self), first)
+		else:
+			elems = list(first)
+			result = [elem for (elem, found) in zip(elems, self._has_each(elems))
+					  if found]
 
-		elif isinstance(self, HDItems):
-			result.update(zip(self._source._keys, self._source._values))
+		out = set(result)
+		for other_set in others[1:]:
+			out.intersection_update(other_set)
+
+		return out
+
+	def difference(self, *others: Iterable[Any]) -> Set[Any]:
+		result = list(self)
 
 		for other_set in others:
-			result = result.difference(other_set)
+			if not result:
+				break
 
-		return result
+			if not isinstance(other_set, AbstractSet):
+				other_set = set(other_set)
 
-	def symmetric_difference(self, *others: Collection[Any]) -> AbstractSet[Any]:
-		result = set()
+			_, result = self._split(result, other_set)
 
-		if isinstance(self, HDKeys):
-			result.update(self._source._keys)
+		return set(result)
 
-		elif isinstance(self, HDItems):
-			result.update(zip(self._source._keys, self._source._values))
+	def symmetric_difference(self, *others: Iterable[Any]) -> Set[Any]:
+		if not others:
+			return set(self)
 
-		for other_set in others:
-			result = result.symmetric_difference(other_set)
+		first = others[0]
+		if not isinstance(first, AbstractSet):
+			first = set(first)
 
-		return result
+		# Elements of this view missing from the first operand, then elements
+		# of the first operand missing from this view
+		_, result = self._split(list(self), first)
+		elems = list(first)
+		result.extend(elem for (elem, found) in zip(elems, self._has_each(elems))
+					  if not found)
+
+		out = set(result)
+		for other_set in others[1:]:
+			out.symmetric_difference_update(other_set)
+
+		return out
 
 
 class HDKeys(HDView, KeysView[Hashable]):
@@ -0,0 +1,196 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from copy import copy, deepcopy
+from pickle import dumps, loads
+
+import pytest
+
+from hypothesis import given, HealthCheck, settings
+from hypothesis.strategies import dictionaries, integers
+from hypothesis.stateful import RuleBasedStateMachine, invariant, rule
+
+from py_hopscotch_dict import HopscotchBiDict
+from test import dict_keys
+
+
+def check_inverse(bd):
+	inverse = bd._inverse
+
+	assert inverse._keys is bd._values
+	assert inverse._values is bd._keys
+	assert inverse._count == bd._count == len(inverse._hashes)
+	assert all(hash(v) == h for (v, h) in zip(bd._values, inverse._hashes))
+
+	for (key, value) in zip(bd._keys, bd._values):
+		assert bd.inverse[value] is key
+
+
+@given(dictionaries(dict_keys, integers(), max_size=1000))
+def test_lookup(gen_dict):
+	gen_dict = {v: k for (k, v) in {v: k for (k, v) in gen_dict.items()}.items()}
+	bd = HopscotchBiDict(gen_dict)
+
+	assert bd == gen_dict
+	assert len(bd.inverse) == len(gen_dict)
+	check_inverse(bd)
+
+	for (key, value) in gen_dict.items():
+		assert value in bd.values()
+		assert bd.keys_for_value(value) == [key]
+
+
+@pytest.mark.parametrize("scenario",
+	["overwrite", "duplicate", "unhashable", "delete", "clear", "copy",
+	 "readonly", "incremental"],
+	ids = ["overwrite", "duplicate-value", "unhashable-value", "delete",
+		   "clear", "copy-and-pickle", "read-only-inverse",
+		   "incremental-resize"])
+def test_bidict(scenario):
+	bd = HopscotchBiDict((i, str(i)) for i in range(1000))
+
+	if scenario == "overwrite":
+		bd[5] = "five"
+		bd[5] = "five"
+		bd[6] = "6"
+
+		assert "5" not in bd.inverse
+		assert bd.inverse["five"] == 5
+		assert len(bd.inverse) == len(bd) == 1000
+		check_inverse(bd)
+
+	elif scenario == "duplicate":
+		with pytest.raises(ValueError):
+			bd[1000] = "5"
+
+		with pytest.raises(ValueError):
+			bd[6] = "5"
+
+		with pytest.raises(ValueError):
+			bd.update({1000: "1000", 1001: "1000"})
+
+		assert bd[6] == "6"
+		assert bd[1000] == "1000"
+		assert 1001 not in bd
+		check_inverse(bd)
+
+	elif scenario == "unhashable":
+		with pytest.raises(TypeError):
+			bd[1000] = ["1000"]
+
+		with pytest.raises(TypeError):
+			bd[5] = ["5"]
+
+		assert len(bd) == 1000
+		assert bd[5] == "5"
+		check_inverse(bd)
+
+	elif scenario == "delete":
+		for i in range(0, 1000, 3):
+			del bd[i]
+
+		assert bd.pop(1) == "1"
+		assert "0" not in bd.inverse
+		assert bd.keys_for_value("1") == []
+
+		with pytest.raises(KeyError):
+			del bd[0]
+
+		check_inverse(bd)
+
+		assert bd.pop_many([2, 3, 4], True) == ["2", True, "4"]
+		key, value = bd.popitem()
+		assert value == str(key)
+		assert "4" not in bd.inverse and value not in bd.inverse
+		check_inverse(bd)
+
+		for i in range(1000):
+			bd.pop(i, True)
+
+		assert len(bd.inverse) == 0
+		check_inverse(bd)
+
+	elif scenario == "clear":
+		bd.clear()
+		bd[0] = "a"
+
+		assert dict(bd.inverse) == {"a": 0}
+		check_inverse(bd)
+
+	elif scenario == "copy":
+		for other in (copy(bd), deepcopy(bd), loads(dumps(bd))):
+			assert isinstance(other, HopscotchBiDict)
+			assert other == bd
+			check_inverse(other)
+
+			other[1000] = "1000"
+			del other[0]
+			check_inverse(other)
+
+		assert "1000" not in bd.inverse
+		assert bd.inverse["0"] == 0
+		check_inverse(bd)
+
+	elif scenario == "readonly":
+		with pytest.raises(TypeError):
+			bd.inverse["1000"] = 1000
+
+		assert 1000 not in bd
+
+	elif scenario == "incremental":
+		bd = HopscotchBiDict(incremental_resize=True)
+		migrating = False
+
+		for i in range(1000):
+			bd[i] = -i
+
+			if bd._old_indices is not None and i % 2:
+				migrating = True
+				del bd[i - 1]
+				check_inverse(bd)
+
+		assert migrating
+		assert bd.inverse[-999] == 999
+
+
+class BiDictStateMachine(RuleBasedStateMachine):
+	def __init__(self):
+		super(BiDictStateMachine, self).__init__()
+		self.d = HopscotchBiDict()
+		self.expected = {}
+
+	@invariant()
+	def consistent(self):
+		assert self.d == self.expected
+		check_inverse(self.d)
+
+	@rule(k=dict_keys, v=dict_keys)
+	def add_entry(self, k, v):
+		owners = [key for (key, val) in self.expected.items() if val == v]
+
+		if owners and owners[0] != k:
+			with pytest.raises(ValueError):
+				self.d[k] = v
+		else:
+			self.d[k] = v
+			self.expected[k] = v
+
+	@rule(k=dict_keys)
+	def remove_entry(self, k):
+		if k not in self.expected:
+			with pytest.raises(KeyError):
+				del self.d[k]
+		else:
+			del self.d[k]
+			del self.expected[k]
+
+# Generating nested keys is sometimes slow enough to trip the health check
+BiDictStateMachine.TestCase.settings = settings(
+	max_examples=50, suppress_health_check=[HealthCheck.too_slow])
+test_bidict_state = BiDictStateMachine.TestCase
@@ -0,0 +1,147 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from copy import copy
+from pickle import dumps, loads
+
+import pytest
+
+from hypothesis import given
+from hypothesis.strategies import dictionaries, integers
+
+from py_hopscotch_dict import FrozenHopscotchDict, HopscotchDict
+from test import dict_keys, sample_dict
+
+
+@given(sample_dict)
+def test_lookup(gen_dict):
+	fd = FrozenHopscotchDict(gen_dict)
+
+	assert len(fd) == len(gen_dict)
+	assert list(fd) == list(gen_dict)
+	assert list(reversed(fd)) == list(reversed(list(gen_dict)))
+
+	for key, value in gen_dict.items():
+		assert key in fd
+		assert fd[key] == value
+		assert fd.get(key) == value
+
+
+@given(dictionaries(dict_keys, dict_keys, max_size=1000))
+def test_hash(gen_dict):
+	fd = FrozenHopscotchDict(gen_dict)
+
+	assert hash(fd) == hash(frozenset(gen_dict.items()))
+	assert hash(fd) == hash(FrozenHopscotchDict(gen_dict))
+	assert {fd: True}[FrozenHopscotchDict(gen_dict)]
+
+
+@pytest.mark.parametrize("scenario",
+	["minimal", "clustered", "missing", "immutable", "unhashable", "eq",
+	 "copy", "str"],
+	ids = ["minimal-table", "clustered-hashes", "missing-keys", "immutable",
+		   "unhashable-values", "eq", "copy-and-pickle", "str"])
+def test_frozen_dict(scenario):
+	hd = HopscotchDict((i, [i]) for i in range(1000))
+
+	if scenario == "minimal":
+		hd.update((i, [i]) for i in range(1000, 2000))
+		for i in range(1000, 2000):
+			del hd[i]
+
+		fd = FrozenHopscotchDict(hd)
+
+		assert fd == hd
+		assert fd._size == hd._min_size_for(len(hd)) < hd._size
+
+	elif scenario == "clustered":
+		hd = HopscotchDict()
+		for i in range(84):
+			hd[i << 14] = i
+
+		fd = FrozenHopscotchDict(hd)
+
+		assert fd == hd
+		for i in range(84):
+			assert fd[i << 14] == i
+
+	elif scenario == "missing":
+		fd = FrozenHopscotchDict(hd, extra=1)
+
+		assert fd["extra"] == 1
+		assert 1000 not in fd
+		assert fd.get(1000) is None
+		assert fd.get(1000, 1) == 1
+
+		with pytest.raises(KeyError):
+			fd[1000]
+
+		with pytest.raises(TypeError):
+			fd[[]]
+
+		assert len(FrozenHopscotchDict()) == 0
+
+	elif scenario == "immutable":
+		fd = FrozenHopscotchDict(hd)
+
+		with pytest.raises(TypeError):
+			fd[0] = 1
+
+		with pytest.raises(AttributeError):
+			fd.extra = 1
+
+		assert not hasattr(fd, "pop")
+
+	elif scenario == "unhashable":
+		fd = FrozenHopscotchDict(hd)
+
+		with pytest.raises(TypeError):
+			hash(fd)
+
+	elif scenario == "eq":
+		fd = FrozenHopscotchDict(hd)
+		other = dict(hd)
+
+		assert fd == other
+		assert fd == FrozenHopscotchDict(other)
+		assert fd != list(other)
+
+		other[0] = [1]
+		assert fd != other
+		assert fd != FrozenHopscotchDict(other)
+
+		del other[0]
+		assert fd != other
+
+		fd = FrozenHopscotchDict((i, i) for i in range(10))
+		other = FrozenHopscotchDict((i, -i) for i in range(10))
+		hash(fd), hash(other)
+		assert fd != other
+
+		# Comparisons with HopscotchDict agree in both directions
+		hd = HopscotchDict((i, i) for i in range(10))
+		assert fd == hd and hd == fd
+		assert not fd != hd and not hd != fd
+
+		other = FrozenHopscotchDict((i, float(i)) for i in range(10))
+		assert other != hd and hd != other
+		assert not other == hd and not hd == other
+
+	elif scenario == "copy":
+		fd = FrozenHopscotchDict(hd)
+
+		assert copy(fd) is fd
+		assert fd.copy() is fd
+		assert loads(dumps(fd)) == fd
+
+	elif scenario == "str":
+		fd = FrozenHopscotchDict(a=1)
+
+		assert str(fd) == "{'a': 1}"
+		assert repr(fd) == "FrozenHopscotchDict({'a': 1})"
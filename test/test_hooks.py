@@ -0,0 +1,150 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from random import Random
+
+import pytest
+
+from py_hopscotch_dict import HopscotchDict, hooks
+
+
+@pytest.fixture
+def events():
+	fired = []
+
+	def _record(event, args):
+		fired.append((event, args))
+
+	hooks.add_hook(_record)
+	yield fired
+	hooks.remove_hook(_record)
+
+
+def test_registry():
+	def _hook(event, args):
+		pass
+
+	with pytest.raises(TypeError):
+		hooks.add_hook(None)
+
+	with pytest.raises(ValueError):
+		hooks.remove_hook(_hook)
+
+	hooks.add_hook(_hook)
+	assert _hook in hooks._hooks
+
+	hooks.remove_hook(_hook)
+	assert not hooks._hooks
+
+
+def test_self_removing_hook():
+	calls = []
+
+	def _once(event, args):
+		calls.append(event)
+		hooks.remove_hook(_once)
+
+	hooks.add_hook(_once)
+	hd = HopscotchDict()
+	for i in range(100):
+		hd[i] = i
+
+	assert calls == [hooks.RESIZE_START]
+	assert not hooks._hooks
+
+
+@pytest.mark.parametrize("incremental", [False, True],
+	ids = ["full-resize", "incremental-resize"])
+def test_resize_events(events, incremental):
+	hd = HopscotchDict(incremental_resize=incremental)
+
+	for i in range(1000):
+		hd[i] = i
+
+	resizes = [(e, a) for (e, a) in events
+			   if e in (hooks.RESIZE_START, hooks.RESIZE_END)]
+
+	assert len(resizes) == 2 * hd.stats()["resizes"]
+	assert resizes[0] == (hooks.RESIZE_START, (8, 32, 7))
+
+	for (start, start_args), (end, end_args) in zip(resizes[::2],
+													 resizes[1::2]):
+		assert start == hooks.RESIZE_START
+		assert end == hooks.RESIZE_END
+		assert end_args[:3] == start_args
+		assert end_args[3] >= 0
+
+	assert resizes[-1][1][1] == hd._size
+
+
+def test_aborted_resize_events(events):
+	# These keys only fit in a table far larger than their count calls for, so
+	# many resizes are abandoned for a larger size
+	hd = HopscotchDict()
+	for i in range(84):
+		hd[i << 14] = i
+
+	resizes = [(e, a) for (e, a) in events
+			   if e in (hooks.RESIZE_START, hooks.RESIZE_END,
+						hooks.RESIZE_ABORT)]
+
+	assert len(resizes) % 2 == 0
+	for (start, start_args), (end, end_args) in zip(resizes[::2],
+													 resizes[1::2]):
+		assert start == hooks.RESIZE_START
+		assert end in (hooks.RESIZE_END, hooks.RESIZE_ABORT)
+		assert end_args[:3] == start_args
+
+	ends = [e for (e, _) in resizes if e == hooks.RESIZE_END]
+	aborts = [a for (e, a) in resizes if e == hooks.RESIZE_ABORT]
+
+	assert aborts
+	assert len(ends) == hd.stats()["resizes"]
+	assert resizes[-1][1][1] == hd._size
+
+
+def test_free_up_events(events):
+	rand = Random(0)
+	hd = HopscotchDict(max_density=1, growth_factor=2)
+
+	for i in range(1000):
+		hd[rand.getrandbits(40)] = i
+
+	free_ups = [a for (e, a) in events if e == hooks.FREE_UP]
+	exhausted = [a for (e, a) in events if e == hooks.NBHD_EXHAUSTED]
+	stats = hd.stats()
+
+	assert free_ups
+	assert all(hops > 0 for (_, hops) in free_ups)
+	assert len(exhausted) == stats["free_up_failures"]
+	assert len(free_ups) + len(exhausted) <= stats["free_up_calls"]
+
+
+def test_nbhd_exhausted_events(events):
+	class CollidingKey(object):
+		def __init__(self, val):
+			self.val = val
+
+		def __eq__(self, other):
+			return isinstance(other, CollidingKey) and self.val == other.val
+
+		def __hash__(self):
+			return 1337
+
+	hd = HopscotchDict()
+
+	for i in range(9):
+		hd[CollidingKey(i)] = i
+
+	exhausted = [a for (e, a) in events if e == hooks.NBHD_EXHAUSTED]
+
+	assert exhausted
+	for (lookup_idx, size, nbhd_size) in exhausted:
+		assert lookup_idx == 1337 % size
+		assert nbhd_size == 8
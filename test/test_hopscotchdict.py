@@ -7,16 +7,18 @@
 #       Released under version 3.0 of the Non-Profit Open Source License       #
 ################################################################################
 
-from copy import copy
-from struct import calcsize, unpack_from
+from copy import copy, deepcopy
+from pickle import dumps, HIGHEST_PROTOCOL, loads
+from random import Random
+from sys import getsizeof
 
 import pytest
 
 from hypothesis import example, given, seed, settings
-from hypothesis.strategies import integers
+from hypothesis.strategies import integers, lists
 from hypothesis.stateful import RuleBasedStateMachine, invariant, rule
 
-from py_hopscotch_dict import HopscotchDict
+from py_hopscotch_dict import HopscotchDict, hopscotchdict
 from test import dict_keys, dict_values, max_dict_entries, sample_dict
 
 
@@ -46,8 +48,8 @@ def test_set_lookup_index_info(gen_dict, lookup_idx, data_idx, nbhd):
 		data_idx = min(nbhd, 2 ** (hd._nbhd_size - 1) - 1)
 		hd._set_lookup_index_info(lookup_idx, data=data_idx, nbhd=nbhd)
 
-		lookup_offset = calcsize(hd._pack_fmt) * lookup_idx
-		retrieved_idx, retrieved_nbhd = unpack_from(hd._pack_fmt, hd._lookup_table, lookup_offset)
+		retrieved_idx = hd._indices[lookup_idx]
+		retrieved_nbhd = hd._nbhds[lookup_idx]
 
 		assert (retrieved_idx, retrieved_nbhd) == (data_idx, nbhd)
 
@@ -72,16 +74,20 @@ def test_make_lookup_table(tbl_size):
 		with pytest.raises(ValueError):
 			HopscotchDict._make_lookup_table(tbl_size)
 	else:
-		tbl, fmt = HopscotchDict._make_lookup_table(tbl_size)
+		indices, nbhds = HopscotchDict._make_lookup_table(tbl_size)
+
+		assert len(indices) == len(nbhds) == tbl_size
+		assert indices.count(HopscotchDict.FREE_ENTRY) == tbl_size
+		assert nbhds.count(0) == tbl_size
 
 		if tbl_size.bit_length() < 8:
-			assert fmt == "b B"
+			assert (indices.typecode, nbhds.typecode) == ("b", "B")
 		elif tbl_size.bit_length() < 16:
-			assert fmt == ">h H"
+			assert (indices.typecode, nbhds.typecode) == ("h", "H")
 		elif tbl_size.bit_length() < 32:
-			assert fmt == ">i I"
+			assert (indices.typecode, nbhds.typecode) == ("i", "I")
 		else:
-			assert fmt == ">l L"
+			assert (indices.typecode, nbhds.typecode) == ("q", "Q")
 
 
 def test_clear_neighbor():
@@ -233,16 +239,13 @@ def test_get_displaced_neighbors(with_collisions):
 
 		assert hd._size == 8
 
-		lookup_offset = calcsize(hd._pack_fmt) * 1
-		_, nbhd = unpack_from(hd._pack_fmt, hd._lookup_table, lookup_offset)
+		nbhd = hd._nbhds[1]
 		assert hd._get_displaced_neighbors(1, nbhd, hd._nbhd_size, hd._size) == [1, 2, 4]
 
-		lookup_offset = calcsize(hd._pack_fmt) * 3
-		_, nbhd = unpack_from(hd._pack_fmt, hd._lookup_table, lookup_offset)
+		nbhd = hd._nbhds[3]
 		assert hd._get_displaced_neighbors(3, nbhd, hd._nbhd_size, hd._size) == [3]
 
-		lookup_offset = calcsize(hd._pack_fmt) * 6
-		_, nbhd = unpack_from(hd._pack_fmt, hd._lookup_table, lookup_offset)
+		nbhd = hd._nbhds[6]
 		assert hd._get_displaced_neighbors(6, nbhd, hd._nbhd_size, hd._size) == [6, 7]
 
 	else:
@@ -256,11 +259,22 @@ def test_get_displaced_neighbors(with_collisions):
 			hd[i] = "test_get_displaced_neighbors_{}".format(i)
 
 		for i in range(6):
-			lookup_offset = calcsize(hd._pack_fmt) * i
-			_, nbhd = unpack_from(hd._pack_fmt, hd._lookup_table, lookup_offset)
+			nbhd = hd._nbhds[i]
 			assert hd._get_displaced_neighbors(i, nbhd, hd._nbhd_size, hd._size) == [i]
 
 
+@given(integers(min_value=0, max_value=2 ** 64 - 1),
+	   integers(min_value=0, max_value=2 ** 20 - 1))
+def test_iter_displaced_neighbors(nbhd, lookup_idx):
+	max_size = 2 ** 20
+	expected = [(lookup_idx + i) % max_size for i in range(64) if nbhd & (1 << i)]
+
+	neighbors = HopscotchDict._iter_displaced_neighbors(lookup_idx, nbhd, max_size)
+
+	assert not isinstance(neighbors, list)
+	assert list(neighbors) == expected
+
+
 @given(dict_keys)
 def test_lookup(key):
 	hd = HopscotchDict()
@@ -331,6 +345,41 @@ def test_resize(scenario):
 		assert hd[17] == "test_17"
 
 
+def test_cached_hashes():
+	class CountedKey(object):
+		hash_calls = 0
+
+		def __init__(self, val):
+			self.val = val
+
+		def __eq__(self, other):
+			return isinstance(other, CountedKey) and self.val == other.val
+
+		def __hash__(self):
+			CountedKey.hash_calls += 1
+			return hash(self.val)
+
+	hd = HopscotchDict()
+	keys = [CountedKey(i) for i in range(100)]
+
+	for key in keys:
+		hd[key] = key.val
+
+	assert CountedKey.hash_calls == 100
+	assert list(hd._hashes) == [hash(k.val) for k in keys]
+
+	hd._resize(1024)
+
+	assert CountedKey.hash_calls == 100
+
+	del hd[keys[0]]
+
+	assert list(hd._hashes) == [hash(k) for k in hd._keys]
+
+	for key in keys[1:]:
+		assert hd[key] == key.val
+
+
 @given(integers(), integers())
 def test_set_neighbor(lookup_idx, nbhd_idx):
 	hd = HopscotchDict()
@@ -392,6 +441,347 @@ def test_dict_init(gen_dict):
 	assert len(hd) == len(gen_dict)
 
 
+@pytest.mark.parametrize("scenario",
+	["pairs", "existing", "small", "clustered", "bad_args"],
+	ids = ["duplicate-pairs", "existing-entries", "fits-current-table",
+		   "clustered-hashes", "too-many-arguments"])
+def test_update(scenario, monkeypatch):
+	hd = HopscotchDict()
+	resizes = []
+	resize = HopscotchDict._resize
+
+	def _counting_resize(self, new_size):
+		resizes.append(new_size)
+		resize(self, new_size)
+
+	if scenario == "pairs":
+		monkeypatch.setattr(HopscotchDict, "_resize", _counting_resize)
+		hd.update([(i % 1000, i) for i in range(5000)], extra=True)
+
+		assert resizes == [2048]
+		assert len(hd) == 1001
+		assert hd["extra"]
+		for i in range(1000):
+			assert hd[i] == 4000 + i
+
+	elif scenario == "existing":
+		for i in range(100):
+			hd[i] = "test_update_{}".format(i)
+
+		other = HopscotchDict((i, i) for i in range(50, 1000))
+
+		monkeypatch.setattr(HopscotchDict, "_resize", _counting_resize)
+		hd.update(other)
+
+		assert resizes == [2048]
+		assert len(hd) == 1000
+		for i in range(50):
+			assert hd[i] == "test_update_{}".format(i)
+		for i in range(50, 1000):
+			assert hd[i] == i
+
+	elif scenario == "small":
+		hd.update({i: i for i in range(100)})
+
+		monkeypatch.setattr(HopscotchDict, "_resize", _counting_resize)
+		hd.update({i: -i for i in range(90, 102)})
+
+		assert resizes == []
+		assert len(hd) == 102
+		for i in range(102):
+			assert hd[i] == (i if i < 90 else -i)
+
+	elif scenario == "clustered":
+		# These keys only fit in a table far larger than a single rebuild
+		# from their minimum size tries, but inserting them one at a time
+		# grows the table that large
+		keys = [i << 14 for i in range(84)]
+
+		for key in keys:
+			hd[key] = key
+
+		for other in (HopscotchDict(dict(hd)), HopscotchDict(hd),
+					  HopscotchDict.fromkeys(keys)):
+			assert list(other) == keys
+			assert other._size == hd._size
+			for key in keys:
+				assert key in other
+
+	elif scenario == "bad_args":
+		with pytest.raises(TypeError):
+			hd.update({}, {})
+
+
+@pytest.mark.parametrize("scenario", ["reserve", "init", "no_shrink", "negative"],
+	ids = ["reserve", "expected-size", "no-shrink", "negative-count"])
+def test_reserve(scenario, monkeypatch):
+	resizes = []
+	resize = HopscotchDict._resize
+
+	def _counting_resize(self, new_size):
+		resizes.append(new_size)
+		resize(self, new_size)
+
+	monkeypatch.setattr(HopscotchDict, "_resize", _counting_resize)
+
+	if scenario == "reserve" or scenario == "init":
+		if scenario == "reserve":
+			hd = HopscotchDict()
+			hd.reserve(1000)
+		else:
+			hd = HopscotchDict(expected_size=1000)
+
+		assert resizes == [2048]
+		assert hd._size == 2048
+		assert hd._nbhd_size == 16
+
+		for i in range(1000):
+			hd["test_reserve_{}".format(i)] = i
+
+		assert resizes == [2048]
+		for i in range(1000):
+			assert hd["test_reserve_{}".format(i)] == i
+
+	elif scenario == "no_shrink":
+		hd = HopscotchDict(expected_size=1000)
+		hd.reserve(10)
+
+		assert resizes == [2048]
+		assert hd._size == 2048
+
+	elif scenario == "negative":
+		hd = HopscotchDict()
+
+		with pytest.raises(ValueError):
+			hd.reserve(-1)
+
+
+@pytest.mark.parametrize("scenario", ["sparse", "dense", "growth", "large", "invalid"],
+	ids = ["low-max-density", "high-max-density", "growth-factor",
+		   "large-table-size", "invalid-settings"])
+def test_growth_policy(scenario):
+	if scenario == "sparse":
+		hd = HopscotchDict(max_density=0.25)
+
+		for i in range(1000):
+			hd["test_growth_policy_{}".format(i)] = i
+			assert hd._count / hd._size < 0.25
+
+		assert hd._size == 8192
+
+	elif scenario == "dense":
+		hd = HopscotchDict(max_density=0.95, growth_factor=2)
+
+		for i in range(900):
+			hd[i] = i
+
+		assert hd._count / hd._size >= 0.8
+		assert hd._size == 1024
+
+	elif scenario == "growth":
+		hd = HopscotchDict(growth_factor=2)
+		sizes = [hd._size]
+
+		for i in range(1000):
+			hd[i] = i
+			if hd._size != sizes[-1]:
+				sizes.append(hd._size)
+
+		assert sizes == [8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+
+	elif scenario == "large":
+		hd = HopscotchDict(growth_factor=8, large_table_size=64)
+		sizes = [hd._size]
+
+		for i in range(1000):
+			hd[i] = i
+			if hd._size != sizes[-1]:
+				sizes.append(hd._size)
+
+		assert sizes == [8, 64, 128, 256, 512, 1024, 2048]
+
+	elif scenario == "invalid":
+		with pytest.raises(ValueError):
+			HopscotchDict(max_density=0)
+
+		with pytest.raises(ValueError):
+			HopscotchDict(max_density=1.5)
+
+		with pytest.raises(ValueError):
+			HopscotchDict(growth_factor=1)
+
+		with pytest.raises(ValueError):
+			HopscotchDict(growth_factor=3)
+
+		with pytest.raises(ValueError):
+			HopscotchDict(growth_factor=2, min_density=0.4)
+
+		assert HopscotchDict(growth_factor=2, min_density=0.3)._min_density == 0.3
+
+
+def test_incremental_resize():
+	hd = HopscotchDict(incremental_resize=True)
+	dc = {}
+	rng = Random(1017)
+	migrations = 0
+
+	for i in range(20000):
+		key = rng.randrange(5000)
+
+		if rng.random() < 0.3 and key in dc:
+			del hd[key]
+			del dc[key]
+		else:
+			hd[key] = i
+			dc[key] = i
+
+		if hd._old_indices is not None:
+			migrations += 1
+
+			# Entries live in exactly one of the two tables
+			old_entries = [idx for idx in hd._old_indices if idx != hd.FREE_ENTRY]
+			new_entries = [idx for idx in hd._indices if idx != hd.FREE_ENTRY]
+			assert sorted(old_entries + new_entries) == list(range(len(hd)))
+
+		assert len(hd) == len(dc)
+
+	assert migrations > 0
+	assert hd == dc
+
+	for key in range(5000):
+		assert (key in hd) == (key in dc)
+
+
+def test_incremental_resize_bounded():
+	hd = HopscotchDict(incremental_resize=True)
+
+	for i in range(1024):
+		hd[i] = i
+
+	# The insert that crosses the maximum density only swaps tables
+	size = hd._size
+	while hd._size == size:
+		hd[len(hd)] = len(hd)
+		assert all(hd[i] == i for i in range(0, len(hd), 97))
+
+	old_size = len(hd._old_indices)
+	assert hd._size == 4 * old_size
+	assert hd._migration_idx == 0
+	assert hd._old_indices.count(hd.FREE_ENTRY) < old_size
+
+	# Every later operation moves at most a batch of slots
+	last_idx = 0
+	while hd._old_indices is not None:
+		hd[len(hd)] = len(hd)
+		if hd._old_indices is not None:
+			assert hd._migration_idx - last_idx == hd.MIGRATION_BATCH_SIZE
+			last_idx = hd._migration_idx
+
+	for i in range(len(hd)):
+		assert hd[i] == i
+
+
+def _table_bytes(hd):
+	return getsizeof(hd._indices) + getsizeof(hd._nbhds)
+
+
+@pytest.mark.parametrize("scenario",
+	["compact", "min_density", "high_min_density", "disabled", "unshrinkable",
+	 "bad_density"],
+	ids = ["compact", "shrink-on-delete", "highest-min-density",
+		   "no-shrink-by-default", "no-smaller-table-fits",
+		   "invalid-min-density"])
+def test_shrink(scenario):
+	if scenario == "compact":
+		hd = HopscotchDict((i, i) for i in range(100000))
+		full_bytes = _table_bytes(hd)
+
+		for i in range(99990):
+			del hd[i]
+
+		assert _table_bytes(hd) == full_bytes
+
+		hd.compact()
+
+		assert hd._size == 16
+		assert hd._nbhd_size == 8
+		assert _table_bytes(hd) < full_bytes / 1000
+		assert len(hd) == 10
+		for i in range(99990, 100000):
+			assert hd[i] == i
+
+		hd.compact()
+		assert hd._size == 16
+
+	elif scenario == "min_density":
+		hd = HopscotchDict(((i, i) for i in range(100000)), min_density=0.1)
+		full_bytes = _table_bytes(hd)
+
+		for i in range(99990):
+			del hd[i]
+			assert hd._count >= hd._size * 0.1 or hd._size == 8
+
+		assert _table_bytes(hd) < full_bytes / 1000
+		for i in range(99990, 100000):
+			assert hd[i] == i
+
+	elif scenario == "high_min_density":
+		# Halving the table on each shrink would leave it below this density
+		hd = HopscotchDict(((i, i) for i in range(200)), growth_factor=2,
+						   min_density=0.39)
+		size = hd._size
+		resizes = hd.stats()["resizes"]
+
+		for i in range(199):
+			del hd[i]
+			assert hd._count >= hd._size * 0.39 or hd._size == 8
+
+		assert hd._size == 8
+		assert hd.stats()["resizes"] - resizes <= (size // 8).bit_length() - 1
+		assert hd[199] == 199
+
+	elif scenario == "disabled":
+		hd = HopscotchDict((i, i) for i in range(1000))
+		size = hd._size
+
+		for i in range(999):
+			del hd[i]
+
+		assert hd._size == size
+
+	elif scenario == "unshrinkable":
+		# These keys only fit in a table far larger than their count calls for
+		hd = HopscotchDict(min_density=0.1)
+		keys = [i << 14 for i in range(84)]
+		for key in keys:
+			hd[key] = key
+
+		size = hd._size
+
+		del hd[keys[0]]
+		hd.compact()
+
+		assert hd._size == size
+		assert len(hd) == 83
+		assert keys[0] not in hd
+		for key in keys[1:]:
+			assert hd[key] == key
+
+	elif scenario == "bad_density":
+		with pytest.raises(ValueError):
+			HopscotchDict(min_density=-0.1)
+
+		with pytest.raises(ValueError):
+			HopscotchDict(min_density=0.5)
+
+
+@given(lists(dict_keys))
+def test_fromkeys(keys):
+	hd = HopscotchDict.fromkeys(keys, "test_fromkeys")
+
+	assert hd == dict.fromkeys(keys, "test_fromkeys")
+
+
 @pytest.mark.parametrize("valid_key", [True, False],
 	ids = ["valid-key", "invalid-key"])
 def test_getitem(valid_key):
@@ -505,6 +895,41 @@ def test_setitem_special_cases(scenario):
 
 
 
+def test_setitem_unsatisfiable():
+	class CollidingKey(object):
+		def __init__(self, val):
+			self.val = val
+
+		def __eq__(self, other):
+			return isinstance(other, CollidingKey) and self.val == other.val
+
+		def __hash__(self):
+			return 1337
+
+	hd = HopscotchDict()
+	inserted = []
+
+	with pytest.raises(RuntimeError):
+		for i in range(hd.MAX_NBHD_SIZE + 1):
+			hd[CollidingKey(i)] = i
+			inserted.append(i)
+
+	# Failed inserts leave the dict as it was before the attempt
+	assert len(hd) == len(inserted)
+	assert len(hd._keys) == len(hd._values) == len(hd._hashes) == len(inserted)
+	assert CollidingKey(len(inserted)) not in hd
+	for i in inserted:
+		assert hd[CollidingKey(i)] == i
+
+	# Updates which can't fit are rolled back entirely
+	with pytest.raises(RuntimeError):
+		hd.update((CollidingKey(i), i) for i in range(1000, 1100))
+
+	assert len(hd) == len(inserted)
+	for i in inserted:
+		assert hd[CollidingKey(i)] == i
+
+
 @pytest.mark.parametrize("scenario", ["found", "missing"],
 	ids = ["found-key", "missing-key"])
 def test_delitem(scenario):
@@ -625,6 +1050,80 @@ def test_eq_and_neq(scenario):
 		assert hd == dc
 
 
+@pytest.mark.parametrize("scenario",
+	["same_order", "other_order", "bad_keys", "bad_vals", "bad_type",
+	 "nan", "migrating", "mapping"],
+	ids = ["same-order", "different-order", "key-mismatch", "value-mismatch",
+		   "value-type-mismatch", "unequal-to-itself", "incremental-resize",
+		   "one-lookup-per-key"])
+def test_eq_special_cases(scenario):
+	hd = HopscotchDict((i, str(i)) for i in range(100))
+
+	if scenario == "same_order":
+		other = hd.copy()
+		assert hd == other
+
+		other[99] = "100"
+		assert hd != other
+
+	elif scenario == "other_order":
+		other = HopscotchDict((i, str(i)) for i in reversed(range(100)))
+		assert hd._keys != other._keys
+		assert hd == other
+
+	elif scenario == "bad_keys":
+		other = HopscotchDict((i, str(i)) for i in range(1, 101))
+		assert hd != other
+
+	elif scenario == "bad_vals":
+		other = HopscotchDict((i, str(i)) for i in reversed(range(100)))
+		other[0] = "1"
+		assert hd != other
+
+	elif scenario == "bad_type":
+		hd = HopscotchDict((i, i) for i in range(100))
+		other = HopscotchDict((i, float(i)) for i in range(100))
+		assert hd != other
+
+		other = HopscotchDict((i, float(i)) for i in reversed(range(100)))
+		assert hd != other
+		assert hd != {i: float(i) for i in range(100)}
+
+	elif scenario == "nan":
+		# The result doesn't depend on the order entries are stored in
+		hd[100] = float("nan")
+		other = HopscotchDict(reversed(list(hd.items())))
+
+		assert hd != hd.copy()
+		assert hd != other
+
+	elif scenario == "migrating":
+		hd = HopscotchDict((i, str(i)) for i in range(103))
+		other = HopscotchDict(incremental_resize=True)
+		for i in reversed(range(103)):
+			other[i] = str(i)
+
+		assert other._old_indices is not None
+		assert hd == other
+		assert other == hd
+
+	elif scenario == "mapping":
+		class CountingDict(dict):
+			lookups = 0
+
+			def get(self, key, default=None):
+				CountingDict.lookups += 1
+				return super(CountingDict, self).get(key, default)
+
+			def __getitem__(self, key):
+				CountingDict.lookups += 1
+				return super(CountingDict, self).__getitem__(key)
+
+		other = CountingDict((i, str(i)) for i in range(100))
+		assert hd == other
+		assert CountingDict.lookups == 100
+
+
 @given(sample_dict)
 def test_reversed(gen_dict):
 	hd = HopscotchDict(gen_dict)
@@ -654,6 +1153,52 @@ def test_get(valid_key):
 	assert hd.get("test_get", 1017) == val
 
 
+@given(sample_dict, lists(dict_keys))
+def test_get_and_contains_many(gen_dict, missing):
+	hd = HopscotchDict(gen_dict)
+	keys = list(gen_dict) + missing
+	sentinel = object()
+
+	assert hd.get_many(keys, sentinel) == [gen_dict.get(k, sentinel)
+										   for k in keys]
+	assert hd.contains_many(iter(keys)) == [k in gen_dict for k in keys]
+
+
+@pytest.mark.parametrize("scenario", ["buffer", "migrating", "pop"],
+	ids = ["caller-buffer", "incremental-resize", "pop-many"])
+def test_batch_special_cases(scenario):
+	hd = HopscotchDict((i, -i) for i in range(100))
+
+	if scenario == "buffer":
+		values = [None] * 200
+		found = [None] * 200
+
+		assert hd.get_many(range(150), 0, values) is values
+		assert hd.contains_many(range(150), found) is found
+		assert values == [-i for i in range(100)] + [0] * 50 + [None] * 50
+		assert found == [True] * 100 + [False] * 50 + [None] * 50
+
+	elif scenario == "migrating":
+		hd = HopscotchDict(incremental_resize=True)
+		for i in range(103):
+			hd[i] = -i
+
+		assert hd._old_indices is not None
+		assert hd.get_many(range(110)) == [-i for i in range(103)] + [None] * 7
+		assert hd.contains_many(range(110)) == [True] * 103 + [False] * 7
+
+	elif scenario == "pop":
+		assert hd.pop_many([1, 2, 3]) == [-1, -2, -3]
+		assert hd.pop_many([4, 1], "missing") == [-4, "missing"]
+
+		with pytest.raises(KeyError):
+			hd.pop_many([5, 1])
+
+		assert 5 not in hd
+		assert len(hd) == 95
+		assert list(hd.items()) == [(k, hd[k]) for k in hd]
+
+
 @pytest.mark.parametrize("scenario", ["valid_key", "invalid_key", "default"],
 	ids = ["valid-key", "invalid-key", "default-value"])
 def test_pop(scenario):
@@ -706,6 +1251,159 @@ def test_setdefault(existing_key):
 	assert hd.setdefault("test_setdefault", 1017) == val
 
 
+@given(sample_dict, lists(dict_keys))
+def test_keys_for_value(gen_dict, removed):
+	hd = HopscotchDict(gen_dict, index_values=True)
+	unindexed = HopscotchDict(gen_dict)
+
+	for key in removed:
+		for d in (hd, unindexed):
+			d.pop(key, True)
+
+	for value in list(hd.values()) + removed:
+		expected = [k for (k, v) in hd.items() if v is value or v == value]
+
+		assert unindexed.keys_for_value(value) == expected
+		assert len(hd.keys_for_value(value)) == len(expected)
+		assert set(hd.keys_for_value(value)) == set(expected)
+		assert (value in hd.values()) == bool(expected)
+
+
+@pytest.mark.parametrize("scenario",
+	["maintained", "unhashable", "update", "clear", "copy", "pickle"],
+	ids = ["set-and-delete", "unhashable-values", "update", "clear",
+		   "copy", "pickle"])
+def test_value_index(scenario):
+	hd = HopscotchDict(((i, i % 10) for i in range(100)), index_values=True)
+
+	if scenario == "maintained":
+		assert hd.keys_for_value(3) == list(range(3, 100, 10))
+
+		for i in range(3, 100, 10):
+			del hd[i]
+
+		assert 3 not in hd.values()
+		assert 3 not in hd._value_index
+
+		hd[5] = 3
+		hd[1000] = 3
+
+		assert hd.keys_for_value(3) == [5, 1000]
+		assert sorted(hd.keys_for_value(5)) == list(range(15, 100, 10))
+
+	elif scenario == "unhashable":
+		hd[1000] = [1]
+		hd[1001] = [1]
+
+		assert [1] in hd.values()
+		assert hd.keys_for_value([1]) == [1000, 1001]
+		assert len(hd._value_index) == 10
+
+		hd[1000] = 1
+		assert hd.keys_for_value([1]) == [1001]
+		assert 1000 in hd.keys_for_value(1)
+
+		del hd[1001]
+		assert [1] not in hd.values()
+
+	elif scenario == "update":
+		hd.update({i: -i for i in range(0, 200, 2)})
+
+		assert hd.keys_for_value(-4) == [4]
+		assert hd.keys_for_value(4) == []
+		assert hd.keys_for_value(5) == list(range(5, 100, 10))
+		assert hd.keys_for_value(-150) == [150]
+
+		hd.update({0: 0, 1: 1})
+		assert hd.keys_for_value(0) == [0]
+
+	elif scenario == "clear":
+		hd.clear()
+		hd[1] = 1
+
+		assert hd._value_index == {1: {1: None}}
+
+	elif scenario == "copy":
+		hdc = copy(hd)
+		hdc[1000] = 1
+		hdd = deepcopy(hd)
+		del hdd[1]
+
+		assert hd.keys_for_value(1) == list(range(1, 100, 10))
+		assert hdc.keys_for_value(1) == list(range(1, 100, 10)) + [1000]
+		assert sorted(hdd.keys_for_value(1)) == list(range(11, 100, 10))
+
+	elif scenario == "pickle":
+		restored = loads(dumps(hd))
+
+		assert restored._value_index == hd._value_index
+		assert loads(dumps(HopscotchDict(hd)))._value_index is None
+
+
+@pytest.mark.parametrize("scenario", ["empty", "collisions", "filled", "incremental"],
+	ids = ["empty-dict", "colliding-keys", "filled-dict", "incremental-resize"])
+def test_stats(scenario):
+	def _full_nbhds(indices):
+		size = len(indices)
+		nbhd_size = HopscotchDict._nbhd_size_for(size)
+		return sum(1 for i in range(size)
+				   if all(indices[(i + j) % size] != HopscotchDict.FREE_ENTRY
+						  for j in range(nbhd_size)))
+
+	if scenario == "empty":
+		hd = HopscotchDict()
+		stats = hd.stats()
+
+		assert stats == {"count": 0, "size": 8, "load_factor": 0,
+						 "nbhd_size": 8, "displacements": [0] * 8,
+						 "full_nbhds": 0, "free_up_calls": 0,
+						 "free_up_failures": 0, "resizes": 0}
+
+	elif scenario == "collisions":
+		hd = HopscotchDict()
+
+		for i in range(4):
+			hd[i * 8] = i
+
+		stats = hd.stats()
+		assert stats["displacements"] == [1, 1, 1, 1, 0, 0, 0, 0]
+		assert stats["load_factor"] == 0.5
+		assert stats["full_nbhds"] == 0
+
+		hd._free_up(0)
+		assert hd.stats()["free_up_calls"] == 1
+
+	elif scenario == "filled":
+		hd = HopscotchDict(max_density=1, growth_factor=2)
+
+		for i in range(1000):
+			hd["test_stats_{}".format(i)] = i
+
+		stats = hd.stats()
+		assert stats["load_factor"] == 1000 / hd._size
+		assert stats["resizes"] == hd._size.bit_length() - 4
+		assert stats["free_up_calls"] > 0
+		assert stats["free_up_calls"] >= stats["free_up_failures"]
+		assert sum(stats["displacements"]) == 1000
+		assert stats["full_nbhds"] == _full_nbhds(hd._indices)
+		assert stats["full_nbhds"] > 0
+
+		hd.clear()
+		assert hd.stats()["resizes"] == stats["resizes"]
+
+	elif scenario == "incremental":
+		hd = HopscotchDict(incremental_resize=True)
+
+		for i in range(103):
+			hd[i] = i
+
+		assert hd._old_indices is not None
+		stats = hd.stats()
+		assert sum(stats["displacements"]) == 103
+		assert stats["full_nbhds"] == (_full_nbhds(hd._indices)
+									   + _full_nbhds(hd._old_indices))
+
+
 @given(sample_dict)
 def test_copy(gen_dict):
 	hd = HopscotchDict(gen_dict)
@@ -715,6 +1413,231 @@ def test_copy(gen_dict):
 	for key in hd._keys:
 		assert id(hd[key]) == id(hdc[key])
 
+	assert hdc == hd
+	assert hdc._indices == hd._indices
+	assert hdc._indices is not hd._indices
+
+
+@pytest.mark.parametrize("scenario",
+	["independent", "subclass", "migrating", "deepcopy", "rehash", "recursive"],
+	ids = ["independent-copy", "subclass-and-config", "incremental-resize",
+		   "deepcopy", "deepcopy-new-hashes", "deepcopy-self-reference"])
+def test_copy_special_cases(scenario):
+	class IdentityKey(object):
+		def __init__(self, val):
+			self.val = val
+
+	if scenario == "independent":
+		hd = HopscotchDict((i, [i]) for i in range(100))
+		hdc = copy(hd)
+
+		hdc[1000] = 1000
+		del hdc[0]
+		hdc[1].append(1)
+
+		assert 1000 not in hd
+		assert hd[0] == [0]
+		assert hd[1] == [1, 1]
+		assert len(hd) == 100
+
+	elif scenario == "subclass":
+		class SubDict(HopscotchDict):
+			pass
+
+		hd = SubDict(max_density=0.5, growth_factor=2, min_density=0.1)
+		hd.extra = "test_copy"
+		for i in range(100):
+			hd[i] = i
+
+		hdc = hd.copy()
+
+		assert type(hdc) is SubDict
+		assert hdc.extra == "test_copy"
+		assert hdc._max_density == 0.5
+		assert hdc._min_density == 0.1
+		assert hdc._growth_factor == 2
+		assert hdc == hd
+
+		class SlottedSubDict(HopscotchDict):
+			__slots__ = ("extra", "unset")
+
+		hd = SlottedSubDict((i, i) for i in range(100))
+		hd.extra = ["test_copy"]
+
+		for hdc in (hd.copy(), deepcopy(hd)):
+			assert type(hdc) is SlottedSubDict
+			assert hdc.extra == ["test_copy"]
+			assert not hasattr(hdc, "unset")
+			assert hdc == hd
+
+		assert hd.copy().extra is hd.extra
+		assert deepcopy(hd).extra is not hd.extra
+
+	elif scenario == "migrating":
+		hd = HopscotchDict(incremental_resize=True)
+		for i in range(103):
+			hd[i] = i
+
+		assert hd._old_indices is not None
+		hdc = hd.copy()
+
+		assert hdc._old_indices == hd._old_indices
+		assert hdc._old_indices is not hd._old_indices
+
+		for i in range(103, 1000):
+			hdc[i] = i
+
+		assert all(hdc[i] == i for i in range(1000))
+		assert all(hd[i] == i for i in range(103))
+		assert len(hd) == 103
+
+	elif scenario == "deepcopy":
+		hd = HopscotchDict((i, [i]) for i in range(100))
+		hdc = deepcopy(hd)
+
+		hdc[1].append(1)
+
+		assert hd[1] == [1]
+		assert hdc._indices == hd._indices
+		assert all(hdc[i] == [i] for i in range(2, 100))
+
+	elif scenario == "rehash":
+		keys = [IdentityKey(i) for i in range(100)]
+		hd = HopscotchDict((k, k.val) for k in keys)
+		hdc = deepcopy(hd)
+
+		for key in hdc:
+			assert hdc[key] == key.val
+			assert key not in hd
+
+	elif scenario == "recursive":
+		hd = HopscotchDict()
+		hd["self"] = hd
+		hdc = deepcopy(hd)
+
+		assert hdc["self"] is hdc
+
+
+# Pickled classes have to be importable, so these can't be defined in the tests
+class PickledKey(object):
+	def __init__(self, val):
+		self.val = val
+
+	def __eq__(self, other):
+		return isinstance(other, PickledKey) and self.val == other.val
+
+	def __hash__(self):
+		return id(self)
+
+
+class PickledSubDict(HopscotchDict):
+	pass
+
+
+class PickledSlottedSubDict(HopscotchDict):
+	__slots__ = ("extra", "unset")
+
+
+@given(sample_dict, integers(min_value=0, max_value=HIGHEST_PROTOCOL))
+def test_pickle(gen_dict, protocol):
+	hd = HopscotchDict(gen_dict)
+
+	hdp = loads(dumps(hd, protocol))
+
+	assert hdp == hd
+	assert hdp._hashes == hd._hashes
+	assert hdp._indices == hd._indices
+	assert hdp._nbhds == hd._nbhds
+
+
+@pytest.mark.parametrize("scenario",
+	["out_of_band", "subclass", "migrating", "rehash", "hash_seed"],
+	ids = ["out-of-band-buffers", "subclass-and-config", "incremental-resize",
+		   "keys-with-new-hashes", "different-hash-seed"])
+def test_pickle_special_cases(scenario, monkeypatch):
+	if scenario == "out_of_band":
+		if HIGHEST_PROTOCOL < 5:									  # pragma: no cover
+			pytest.skip("Out-of-band buffers require pickle protocol 5")
+
+		hd = HopscotchDict((str(i), i) for i in range(1000))
+		buffers = []
+		hdp = loads(dumps(hd, 5, buffer_callback=buffers.append),
+					buffers=buffers)
+
+		assert len(buffers) == 3
+		assert hdp == hd
+		assert hdp._indices == hd._indices
+
+		hdp["new"] = 1
+		assert "new" not in hd
+
+	elif scenario == "subclass":
+		hd = PickledSubDict(max_density=0.5, growth_factor=2, min_density=0.1)
+		hd.extra = "test_pickle"
+		for i in range(100):
+			hd[i] = i
+
+		hdp = loads(dumps(hd))
+
+		assert type(hdp) is PickledSubDict
+		assert hdp.extra == "test_pickle"
+		assert hdp._max_density == 0.5
+		assert hdp._min_density == 0.1
+		assert hdp._growth_factor == 2
+		assert hdp == hd
+
+		hd = PickledSlottedSubDict((i, i) for i in range(100))
+		hd.extra = "test_pickle"
+		hdp = loads(dumps(hd))
+
+		assert type(hdp) is PickledSlottedSubDict
+		assert hdp.extra == "test_pickle"
+		assert not hasattr(hdp, "unset")
+		assert hdp == hd
+
+	elif scenario == "migrating":
+		hd = HopscotchDict(incremental_resize=True)
+		for i in range(103):
+			hd[i] = i
+
+		assert hd._old_indices is not None
+		hdp = loads(dumps(hd))
+
+		assert hdp._old_indices == hd._old_indices
+		assert hdp._migration_idx == hd._migration_idx
+
+		for i in range(103, 1000):
+			hdp[i] = i
+
+		assert all(hdp[i] == i for i in range(1000))
+
+	elif scenario == "rehash":
+		hd = HopscotchDict((PickledKey(i), i) for i in range(100))
+		hdp = loads(dumps(hd))
+
+		assert hdp._hashes != hd._hashes
+		for key in hdp:
+			assert hdp[key] == key.val
+
+	elif scenario == "hash_seed":
+		hd = HopscotchDict((str(i), i) for i in range(100))
+		data = dumps(hd)
+
+		rebuilds = []
+		rebuild = HopscotchDict._rebuild
+
+		def _rebuild(self, new_size):
+			rebuilds.append(new_size)
+			rebuild(self, new_size)
+
+		monkeypatch.setattr(hopscotchdict, "_HASH_CHECK",
+							hopscotchdict._HASH_CHECK + 1)
+		monkeypatch.setattr(HopscotchDict, "_rebuild", _rebuild)
+		hdp = loads(data)
+
+		assert rebuilds == [hd._size]
+		assert hdp == hd
+
 
 @given(sample_dict)
 def test_str(gen_dict):
@@ -744,12 +1667,16 @@ class HopscotchStateMachine(RuleBasedStateMachine):
 
 	@invariant()
 	def no_missing_data(self):
-		assert len(self.d._keys) == len(self.d._values)
+		assert len(self.d._keys) == len(self.d._values) == len(self.d._hashes)
+
+	@invariant()
+	def valid_hashes(self):
+		assert all(hash(k) == h for (k, h) in zip(self.d._keys, self.d._hashes))
 
 	@invariant()
 	def bounded_density(self):
 		if self.d._count > 0:
-			assert self.d._count / self.d._size <= self.d.MAX_DENSITY
+			assert self.d._count / self.d._size <= self.d._max_density
 
 	@rule(k=dict_keys, v=dict_values)
 	def add_entry(self, k, v):
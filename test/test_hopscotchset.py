@@ -0,0 +1,182 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from copy import copy
+from pickle import dumps, loads
+
+import pytest
+
+from hypothesis import given
+from hypothesis.strategies import lists
+
+from py_hopscotch_dict import HopscotchSet
+from test import dict_keys
+
+
+def check_table(hs):
+	table = hs._table
+
+	assert table._values == []
+	assert table._count == len(table._keys) == len(table._hashes)
+	assert all(hash(k) == h for (k, h) in zip(table._keys, table._hashes))
+
+	for key in table._keys:
+		assert table._lookup(key)[1] is not None
+
+
+@given(lists(dict_keys), lists(dict_keys))
+def test_set_algebra(first, second):
+	hs1 = HopscotchSet(first)
+	hs2 = HopscotchSet(second)
+	s1 = set(first)
+	s2 = set(second)
+
+	assert hs1 == s1
+	assert len(hs1) == len(s1)
+
+	for (result, expected) in ((hs1 | hs2, s1 | s2),
+							   (hs1 & hs2, s1 & s2),
+							   (hs1 - hs2, s1 - s2),
+							   (hs1 ^ hs2, s1 ^ s2),
+							   (hs1 | s2, s1 | s2),
+							   (s1 & hs2, s1 & s2),
+							   (hs1 - s2, s1 - s2),
+							   (s1 ^ hs2, s1 ^ s2)):
+		assert isinstance(result, HopscotchSet)
+		assert result == expected
+		assert len(result) == len(expected)
+		check_table(result)
+
+	assert (hs1 <= hs2) == (s1 <= s2)
+	assert hs1.isdisjoint(hs2) == s1.isdisjoint(s2)
+
+
+@given(lists(dict_keys), lists(dict_keys))
+def test_add_and_discard(added, removed):
+	hs = HopscotchSet()
+	expected = set()
+
+	for key in added:
+		hs.add(key)
+		expected.add(key)
+
+	check_table(hs)
+
+	for key in removed:
+		hs.discard(key)
+		expected.discard(key)
+
+	assert hs == expected
+	check_table(hs)
+
+
+@pytest.mark.parametrize("scenario",
+	["duplicates", "clustered", "remove", "pop", "clear", "in_place", "edit",
+	 "copy", "repr"],
+	ids = ["duplicate-keys", "clustered-hashes", "remove", "pop", "clear",
+		   "in-place-operators", "small-differences", "copy-and-pickle",
+		   "repr"])
+def test_hopscotch_set(scenario):
+	hs = HopscotchSet(range(1000))
+
+	if scenario == "duplicates":
+		hs = HopscotchSet([1, 1.0, True, 2, 2])
+
+		assert len(hs) == 2
+		assert list(hs) == [1, 2]
+
+		hs.add(2.0)
+		assert len(hs) == 2
+
+	elif scenario == "clustered":
+		# These hashes only fit in a table several hundred times larger than
+		# the number of keys
+		keys = [i / 7 for i in range(500, 1500)]
+		hs = HopscotchSet(keys)
+
+		assert hs == set(keys)
+		assert HopscotchSet(keys[:500]) | HopscotchSet(keys[500:]) == set(keys)
+		check_table(hs)
+
+	elif scenario == "remove":
+		hs.remove(0)
+
+		with pytest.raises(KeyError):
+			hs.remove(0)
+
+		assert 0 not in hs
+		assert len(hs) == 999
+		check_table(hs)
+
+	elif scenario == "pop":
+		assert hs.pop() == 999
+		assert 999 not in hs
+
+		for _ in range(999):
+			hs.pop()
+
+		with pytest.raises(KeyError):
+			hs.pop()
+
+		check_table(hs)
+
+	elif scenario == "clear":
+		hs.clear()
+		hs.add("a")
+
+		assert hs == {"a"}
+		assert hs._table._size == 8
+
+	elif scenario == "in_place":
+		other = HopscotchSet(range(500, 1500))
+		hs &= other
+		assert hs == set(range(500, 1000))
+
+		hs |= HopscotchSet(range(2000, 2010))
+		hs -= set(range(500, 600))
+		hs ^= HopscotchSet(range(2005, 2015))
+
+		assert hs == set(range(600, 1000)) | set(range(2000, 2005)) | set(range(2010, 2015))
+		check_table(hs)
+
+	elif scenario == "edit":
+		# Results that differ from an operand by a few keys are made by editing
+		# a copy of its lookup table
+		other = HopscotchSet(range(5, 1005))
+
+		for (result, expected) in ((hs | other, set(range(1005))),
+								   (other | hs, set(range(1005))),
+								   (hs & other, set(range(5, 1000))),
+								   (hs - HopscotchSet([5, 2000]), set(range(1000)) - {5}),
+								   (hs ^ other, set(range(5)) | set(range(1000, 1005)))):
+			assert result == expected
+			assert len(result) == len(expected)
+			check_table(result)
+
+		assert (hs | other)._table._size == hs._table._size
+		assert 0 in hs
+		assert 1000 not in hs
+
+	elif scenario == "copy":
+		for other in (copy(hs), hs.copy(), loads(dumps(hs))):
+			assert isinstance(other, HopscotchSet)
+			assert other == hs
+
+			other.add(1000)
+			other.discard(0)
+			check_table(other)
+
+		assert 1000 not in hs
+		assert 0 in hs
+
+	elif scenario == "repr":
+		hs = HopscotchSet(["a", 1])
+
+		assert repr(hs) == "HopscotchSet(['a', 1])"
+		assert eval(repr(hs)) == hs
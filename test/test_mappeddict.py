@@ -0,0 +1,120 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from pickle import dumps, loads
+from tempfile import TemporaryDirectory
+from os.path import join
+
+import pytest
+
+from hypothesis import given
+from hypothesis.strategies import dictionaries, integers
+
+from py_hopscotch_dict import HopscotchDict, MappedHopscotchDict
+from py_hopscotch_dict import mappeddict
+
+
+int64s = integers(min_value=-2 ** 63, max_value=2 ** 63 - 1)
+
+
+@given(dictionaries(int64s, int64s, max_size=2000))
+def test_round_trip(gen_dict):
+	with TemporaryDirectory() as tmp_dir:
+		path = join(tmp_dir, "table")
+
+		with MappedHopscotchDict.write(path, gen_dict) as md:
+			assert len(md) == len(gen_dict)
+			assert dict(md.items()) == gen_dict
+
+			for key, value in gen_dict.items():
+				assert key in md
+				assert md[key] == value
+
+
+@pytest.mark.parametrize("scenario",
+	["pairs", "formats", "missing", "shared", "pickle"],
+	ids = ["duplicate-pairs", "other-formats", "missing-keys", "shared-file",
+		   "pickle"])
+def test_mapped_dict(tmp_path, scenario):
+	path = str(tmp_path / "table")
+
+	if scenario == "pairs":
+		with MappedHopscotchDict.write(path, [(1, 1), (2, 2), (1, 3)]) as md:
+			assert len(md) == 2
+			assert md[1] == 3
+
+	elif scenario == "formats":
+		data = {i: i / 4 for i in range(1000)}
+		with MappedHopscotchDict.write(path, data, "H", "d") as md:
+			assert md == data
+			assert md[10.0] == 2.5
+
+		with pytest.raises(ValueError):
+			MappedHopscotchDict.write(path, data, "l")
+
+		with pytest.raises(ValueError):
+			MappedHopscotchDict.write(path, data, "q", "u")
+
+	elif scenario == "missing":
+		with MappedHopscotchDict.write(path, {}) as md:
+			assert len(md) == 0
+			assert 0 not in md
+
+		with MappedHopscotchDict.write(path, {i: i for i in range(100)}) as md:
+			assert 100 not in md
+			assert "0" not in md
+			assert md.get(-1) is None
+
+			with pytest.raises(KeyError):
+				md[100]
+
+	elif scenario == "shared":
+		data = HopscotchDict((i * 7919, i) for i in range(10000))
+		MappedHopscotchDict.write(path, data).close()
+
+		with MappedHopscotchDict(path) as md1, MappedHopscotchDict(path) as md2:
+			assert md1 == md2 == data
+
+	elif scenario == "pickle":
+		with MappedHopscotchDict.write(path, {1: 2}) as md:
+			mdp = loads(dumps(md))
+
+		assert repr(mdp) == "MappedHopscotchDict({0!r})".format(path)
+		assert mdp[1] == 2
+		mdp.close()
+
+
+@pytest.mark.parametrize("scenario",
+	["short", "magic", "version", "byte_order", "formats", "truncated"],
+	ids = ["short-file", "bad-magic", "bad-version", "bad-byte-order",
+		   "bad-formats", "truncated-file"])
+def test_invalid_file(tmp_path, scenario):
+	path = tmp_path / "table"
+
+	if scenario == "truncated":
+		MappedHopscotchDict.write(str(path), {i: i for i in range(1000)}).close()
+		path.write_bytes(path.read_bytes()[:-100])
+
+	elif scenario == "short":
+		path.write_bytes(mappeddict.MAGIC)
+	elif scenario == "magic":
+		path.write_bytes(b"\0" * 64)
+	elif scenario == "version":
+		path.write_bytes(mappeddict._HEADER.pack(
+			mappeddict.MAGIC, 0, mappeddict._BYTE_ORDER, b"bBqq", 8, 8, 0))
+	elif scenario == "byte_order":
+		path.write_bytes(mappeddict._HEADER.pack(
+			mappeddict.MAGIC, mappeddict.FORMAT_VERSION, b"?", b"bBqq", 8, 8, 0))
+	elif scenario == "formats":
+		path.write_bytes(mappeddict._HEADER.pack(
+			mappeddict.MAGIC, mappeddict.FORMAT_VERSION,
+			mappeddict._BYTE_ORDER, b"bBq\xff", 8, 8, 0))
+
+	with pytest.raises(ValueError):
+		MappedHopscotchDict(str(path))
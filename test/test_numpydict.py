@@ -0,0 +1,101 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+import pytest
+
+from hypothesis import given
+from hypothesis.strategies import dictionaries, integers, lists
+
+np = pytest.importorskip("numpy")
+
+from py_hopscotch_dict import IntHopscotchDict
+
+
+int64s = integers(min_value=-2 ** 63, max_value=2 ** 63 - 1)
+
+
+@given(lists(dictionaries(int64s, int64s, max_size=200), max_size=5))
+def test_insert_and_lookup(batches):
+	ihd = IntHopscotchDict()
+	expected = {}
+
+	for batch in batches:
+		ihd.insert(np.array(list(batch), dtype=np.int64),
+				   np.array(list(batch.values()), dtype=np.int64))
+		expected.update(batch)
+
+	keys = np.array(list(expected), dtype=np.int64)
+	values = np.array(list(expected.values()), dtype=np.int64)
+
+	assert len(ihd) == len(expected)
+	assert list(ihd) == list(expected)
+	assert (ihd.lookup(keys) == values).all()
+	assert ihd.contains(keys).all()
+
+	for key, value in expected.items():
+		assert ihd[key] == value
+
+
+@pytest.mark.parametrize("scenario",
+	["duplicates", "missing", "shape", "dtype", "scalar", "collisions"],
+	ids = ["duplicate-keys", "missing-keys", "array-shapes", "value-dtype",
+		   "scalar-access", "unsatisfiable"])
+def test_int_dict(scenario):
+	ihd = IntHopscotchDict(np.arange(1000), np.arange(1000) * 2)
+
+	if scenario == "duplicates":
+		ihd.insert([5, 2000, 5, 2000, 2001], [1, 2, 3, 4, 5])
+
+		assert len(ihd) == 1002
+		assert ihd.lookup([5, 2000, 2001]).tolist() == [3, 4, 5]
+		assert list(ihd)[-2:] == [2000, 2001]
+
+	elif scenario == "missing":
+		assert ihd.contains([1, -1, 1000]).tolist() == [True, False, False]
+		assert ihd.lookup([1, -1], default=-7).tolist() == [2, -7]
+
+		with pytest.raises(KeyError):
+			ihd.lookup([1, -1])
+
+	elif scenario == "shape":
+		keys = np.arange(12).reshape(3, 4)
+
+		assert ihd.lookup(keys).shape == (3, 4)
+		assert (ihd.lookup(keys) == keys * 2).all()
+		assert ihd.contains(keys).shape == (3, 4)
+
+		with pytest.raises(ValueError):
+			ihd.insert([1, 2], [1])
+
+	elif scenario == "dtype":
+		ihd = IntHopscotchDict([1, 2], [0.5, 1.5], value_dtype=np.float64)
+
+		assert ihd.lookup([2, 1]).tolist() == [1.5, 0.5]
+		assert ihd.lookup([3], default=np.nan).dtype == np.float64
+
+	elif scenario == "scalar":
+		assert ihd[np.int32(10)] == 20
+		assert 10 in ihd
+		assert "10" not in ihd
+		assert 2 ** 64 not in ihd
+		assert ihd.get(-1) is None
+
+		with pytest.raises(KeyError):
+			ihd[-1]
+
+	elif scenario == "collisions":
+		# Every new key maps to the same index at any table size, and the
+		# values of the existing keys given with them are left alone
+		with pytest.raises(RuntimeError):
+			ihd.insert(np.concatenate([np.arange(10), np.arange(1, 200) << 40]),
+					   np.arange(-10, 199))
+
+		assert len(ihd) == 1000
+		assert ihd.contains(np.arange(1, 200) << 40).sum() == 0
+		assert (ihd.lookup(np.arange(1000)) == np.arange(1000) * 2).all()
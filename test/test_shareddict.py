@@ -0,0 +1,208 @@
+# encoding: utf-8
+
+################################################################################
+#                              py-hopscotch-dict                               #
+#    Full-featured `dict` replacement with guaranteed constant-time lookups    #
+#                       (C) 2017, 2019-2020 Jeremy Brown                       #
+#       Released under version 3.0 of the Non-Profit Open Source License       #
+################################################################################
+
+from array import array
+from gc import collect
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.shared_memory import SharedMemory
+from pickle import dumps, loads
+from subprocess import PIPE, Popen, run
+import os
+import sys
+
+import pytest
+
+from hypothesis import given
+from hypothesis.strategies import (binary,
+								   booleans,
+								   dictionaries,
+								   floats,
+								   integers,
+								   none,
+								   one_of,
+								   text,
+								   )
+
+from py_hopscotch_dict import HopscotchDict, SharedHopscotchDict
+from py_hopscotch_dict import shareddict
+
+
+primitives = one_of(none(),
+					booleans(),
+					integers(),
+					floats(allow_nan=False),
+					text(),
+					binary())
+
+
+def _read_shared(shared, keys):
+	return [shared[key] for key in keys]
+
+
+@given(dictionaries(primitives, primitives, max_size=500))
+def test_round_trip(gen_dict):
+	with SharedHopscotchDict.freeze(gen_dict) as sd:
+		try:
+			with SharedHopscotchDict(sd._shm.name) as attached:
+				assert len(attached) == len(gen_dict)
+				assert list(attached) == list(gen_dict)
+				assert dict(attached.items()) == gen_dict
+
+				for key, value in gen_dict.items():
+					assert key in attached
+					assert attached.get(key) == value
+					assert type(attached[key]) is type(value)
+		finally:
+			sd.unlink()
+
+
+@pytest.mark.parametrize("scenario",
+	["hopscotch", "missing", "unsupported", "hash_seed", "pickle", "process",
+	 "independent", "none", "collect"],
+	ids = ["from-hopscotchdict", "missing-keys", "unsupported-types",
+		   "different-hash-seed", "pickle", "other-process",
+		   "independent-process", "none-key-other-process",
+		   "collect-unclosed"])
+def test_shared_dict(scenario, monkeypatch):
+	data = HopscotchDict((str(i), i) for i in range(1000))
+
+	if scenario == "unsupported":
+		with pytest.raises(TypeError):
+			SharedHopscotchDict.freeze({(1, 2): 1})
+
+		with pytest.raises(TypeError):
+			SharedHopscotchDict.freeze({1: [1]})
+
+		return
+
+	env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+	if scenario == "none":
+		# Two processes sharing a hash seed hash strings the same, but may
+		# still hash None differently, so neither can be this one
+		env["PYTHONHASHSEED"] = "0"
+		script = ("import sys\n"
+				  "from py_hopscotch_dict import SharedHopscotchDict\n"
+				  "sd = SharedHopscotchDict.freeze({None: 1, 'a': 2})\n"
+				  "print(sd._shm.name, flush=True)\n"
+				  "sys.stdin.readline()\n"
+				  "sd.close()\n"
+				  "sd.unlink()\n")
+		with Popen([sys.executable, "-c", script], env=env, stdin=PIPE,
+				   stdout=PIPE, text=True) as owner:
+			try:
+				name = owner.stdout.readline().strip()
+				script = ("from py_hopscotch_dict import SharedHopscotchDict\n"
+						  "with SharedHopscotchDict({0!r}) as sd:\n"
+						  "	assert sd[None] == 1 and sd['a'] == 2\n"
+						  ).format(name)
+				run([sys.executable, "-c", script], env=env, check=True)
+			finally:
+				owner.stdin.write("\n")
+				owner.stdin.flush()
+
+		assert owner.returncode == 0
+		return
+
+	sd = SharedHopscotchDict.freeze(data)
+
+	try:
+		if scenario == "hopscotch":
+			assert sd == data
+			assert sd._hashes.tolist() == data._hashes.tolist()
+
+		elif scenario == "missing":
+			assert "1000" not in sd
+			assert 0 not in sd
+			assert sd.get(b"0", -1) == -1
+
+			with pytest.raises(KeyError):
+				sd["1000"]
+
+			with pytest.raises(TypeError):
+				sd[[]]
+
+		elif scenario == "hash_seed":
+			monkeypatch.setattr(shareddict, "_HASH_CHECK",
+								shareddict._HASH_CHECK + 1)
+			with SharedHopscotchDict(sd._shm.name) as attached:
+				assert isinstance(attached._indices.obj, array)
+				assert attached == data
+
+		elif scenario == "pickle":
+			with loads(dumps(sd)) as attached:
+				assert repr(attached) == repr(sd)
+				assert attached == data
+
+		elif scenario == "process":
+			if "fork" not in get_all_start_methods():			  # pragma: no cover
+				pytest.skip("Requires the fork start method")
+
+			keys = ["0", "500", "999"]
+			with get_context("fork").Pool(2) as pool:
+				results = pool.starmap(_read_shared, [(sd, keys)] * 2)
+
+			assert results == [[0, 500, 999]] * 2
+
+		elif scenario == "independent":
+			# A process that isn't a child of this one has its own resource
+			# tracker, which must not free the block when the process exits;
+			# the process waits for its tracker to finish before exiting
+			script = ("import os\n"
+					  "from multiprocessing import resource_tracker\n"
+					  "from py_hopscotch_dict import SharedHopscotchDict\n"
+					  "with SharedHopscotchDict({0!r}) as sd:\n"
+					  "	assert sd['500'] == 500\n"
+					  "tracker = resource_tracker._resource_tracker\n"
+					  "if tracker._fd is not None:\n"
+					  "	os.close(tracker._fd)\n"
+					  "	os.waitpid(tracker._pid, 0)\n").format(sd._shm.name)
+			run([sys.executable, "-c", script], env=env, check=True)
+
+			with SharedHopscotchDict(sd._shm.name) as attached:
+				assert attached == data
+
+		elif scenario == "collect":
+			# Such as a dict unpickled by a worker, which never closes it
+			unraisable = []
+			monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+			attached = loads(dumps(sd))
+			assert attached == data
+			del attached
+			collect()
+			assert unraisable == []
+	finally:
+		sd.close()
+		sd.unlink()
+
+
+@pytest.mark.parametrize("scenario", ["magic", "version", "byte_order"],
+	ids = ["bad-magic", "bad-version", "bad-byte-order"])
+def test_invalid_block(scenario, monkeypatch):
+	header = list(shareddict._HEADER.unpack(bytes(shareddict._HEADER.size)))
+	header[:5] = [shareddict.MAGIC, shareddict.FORMAT_VERSION,
+				  shareddict._BYTE_ORDER, 0, b"bB"]
+
+	if scenario == "magic":
+		header[0] = b"\0" * 8
+	elif scenario == "version":
+		header[1] = 0
+	elif scenario == "byte_order":
+		header[2] = b"?"
+
+	shm = SharedMemory(create=True, size=64)
+	monkeypatch.setattr(shareddict, "_CREATED", {shm.name})
+	try:
+		shareddict._HEADER.pack_into(shm.buf, 0, *header)
+
+		with pytest.raises(ValueError):
+			SharedHopscotchDict(shm.name)
+	finally:
+		shm.close()
+		shm.unlink()
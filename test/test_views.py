@@ -10,7 +10,7 @@
 import pytest
 
 from hypothesis import example, given, seed, settings
-from hypothesis.strategies import integers
+from hypothesis.strategies import integers, lists
 from hypothesis.stateful import RuleBasedStateMachine, invariant, rule
 
 from py_hopscotch_dict import HopscotchDict
@@ -260,3 +260,56 @@ def test_symmetric_difference():
 
 	assert items ^ zip(s3, s6) == items | zip(s3, s6)
 	assert items.symmetric_difference(zip(s3, s6)) == items | zip(s3, s6)
+
+
+@given(sample_dict, lists(dict_keys))
+def test_keys_algebra(gen_dict, gen_keys):
+	hd = HopscotchDict(gen_dict)
+	keys = hd.keys()
+	expected = gen_dict.keys()
+	other = set(gen_keys)
+
+	assert keys & other == expected & other
+	assert other & keys == other & expected
+	assert keys & gen_keys == expected & gen_keys
+	assert keys - other == expected - other
+	assert keys ^ other == expected ^ other
+	assert other ^ keys == other ^ expected
+	assert keys | other == expected | other
+
+	assert keys.issuperset(gen_keys) == all(k in gen_dict for k in gen_keys)
+	assert keys.issubset(gen_keys) == (expected <= other)
+
+	other_hd = HopscotchDict.fromkeys(gen_keys)
+	assert keys & other_hd.keys() == expected & other
+	assert keys - other_hd.keys() == expected - other
+	assert (keys <= other_hd.keys()) == (expected <= other)
+
+
+def test_items_algebra():
+	hd = HopscotchDict()
+	items = hd.items()
+
+	for i in range(100):
+		hd[i] = i
+
+	# Only the items need to be hashable, not the values of the dict
+	hd["unhashable"] = [1]
+
+	small = {(1, 1), (2, 3), ("unhashable", 1), (200, 200)}
+	large = set(zip(range(1000), range(1000)))
+
+	assert items & small == {(1, 1)}
+	assert small & items == {(1, 1)}
+	assert items.issuperset([(1, 1), (1, 1), (2, 2)])
+	assert not items.issuperset([(1, 1), (2, 3)])
+	assert not items.issuperset([(1, 1, 1)])
+
+	del hd["unhashable"]
+
+	assert items.intersection(large, small) == {(1, 1)}
+	assert items & large == set(zip(range(100), range(100)))
+	assert items <= large
+	assert not items >= large
+	assert items - large == set()
+	assert items ^ large == set(zip(range(100, 1000), range(100, 1000)))